@@ -36,8 +36,16 @@ try:
 except ImportError:
     HAS_PROGRESS = False
 
+# hf_xet progress events arrive several times a second per download.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 HTTP_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) ArrakisStart/2.0"
+# Progress bars redraw with \r, so both \r and \n end a line.
+_LINE_BREAK_RE = re.compile(rb'[\r\n]')
 
 # Force unbuffered output for real-time progress
 os.environ['PYTHONUNBUFFERED'] = '1'
@@ -74,6 +82,39 @@ ARRAKIS_DIR = Path(__file__).parent
 ARRAKIS_VENV_BIN = Path(os.environ.get('ARRAKIS_VENV_BIN', str(ARRAKIS_DIR / '.venv' / 'bin')))
 
 
+def _spawn_process(cmd: List[str], **kwargs) -> subprocess.Popen:
+    """Popen a download backend on CPython's posix_spawn fast path.
+
+    CPython only skips fork+exec when the executable is an absolute path and
+    close_fds is False, so resolve the binary up front. Keeping fds open is
+    safe here: every fd Python creates is non-inheritable (PEP 446), so a
+    concurrent download's pipe never leaks into this child and EOF on the
+    reader side still arrives when the child exits.
+    """
+    executable = cmd[0]
+    if not os.path.dirname(executable):
+        executable = shutil.which(executable) or executable
+    return subprocess.Popen([executable, *cmd[1:]], close_fds=False, **kwargs)
+
+
+_api_local = threading.local()
+
+
+def _api_session() -> requests.Session:
+    """
+    Keep-alive session for Hugging Face / Civitai API calls, one per thread.
+
+    Size probes and Civitai auth checks hit the same few hosts for every model;
+    reusing the connection skips a TCP+TLS handshake per call. Per thread
+    because requests.Session is not safe to share between download workers.
+    """
+    session = getattr(_api_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _api_local.session = session
+    return session
+
+
 def cleanup_incomplete_downloads(
     models_dir: Path,
     hf_partial_root: Optional[Path] = None,
@@ -194,6 +235,10 @@ class DownloadManager:
         self.aria2_splits = os.environ.get('ARIA2_SPLITS', self.aria2_connections)
         self.aria2_min_split_size = os.environ.get('ARIA2_MIN_SPLIT_SIZE', '1M')
         self.aria2_stall_timeout_seconds = int(os.environ.get('ARIA2_STALL_TIMEOUT_SECONDS', '120'))
+        # Cloud containers often get AAAA records without a working IPv6 route,
+        # and every connection then eats a v6 connect timeout before falling
+        # back to v4. On by default; set ARIA2_DISABLE_IPV6=0 where v6 works.
+        self.aria2_disable_ipv6 = os.environ.get('ARIA2_DISABLE_IPV6', '1').strip() not in ('0', '', 'false', 'False')
         logger.info(
             f"aria2 settings: connections={self.aria2_connections} "
             f"(HF={self.aria2_hf_connections}), "
@@ -214,6 +259,10 @@ class DownloadManager:
         self._active_procs: "set[subprocess.Popen]" = set()
         self._process_lock = threading.Lock()
         self._failures_lock = threading.Lock()
+        # Per-(repo, revision) file sizes from one metadata call, shared by
+        # every file a batch pulls from the same HF repo.
+        self._hf_sizes_cache: Dict[Tuple[str, str], Optional[Dict[str, int]]] = {}
+        self._hf_sizes_lock = threading.Lock()
         # In-flight worker accounting, so destructive shutdown cleanup can wait
         # for workers to unwind instead of racing them.
         self._inflight = 0
@@ -676,7 +725,7 @@ class DownloadManager:
             # stream=True + context manager: we only inspect status/headers (and a
             # small JSON error body), never the file body. Without it, a rare 200
             # carrying the file inline would buffer the entire model into RAM.
-            with requests.get(
+            with _api_session().get(
                 auth_url,
                 headers=headers,
                 allow_redirects=False,
@@ -721,20 +770,23 @@ class DownloadManager:
         Python's default line iteration only splits on \\n, so progress
         updates are buffered until a newline arrives (often only at the end).
         This method yields each \\r-delimited update as a separate line.
+
+        Reads whatever the pipe has ready (one syscall per chunk, not per byte)
+        and keeps the unterminated tail for the next chunk, so a multi-byte
+        character split across reads is only decoded once complete.
         """
-        buf = bytearray()
+        read = getattr(stream, 'read1', stream.read)
+        buf = b''
         while True:
-            chunk = stream.read(1)
+            chunk = read(65536)
             if not chunk:
                 if buf:
                     yield buf.decode('utf-8', errors='replace')
                 break
-            if chunk in (b'\r', b'\n'):
-                if buf:
-                    yield buf.decode('utf-8', errors='replace')
-                    buf = bytearray()
-            else:
-                buf += chunk
+            *lines, buf = _LINE_BREAK_RE.split(buf + chunk)
+            for line in lines:
+                if line:
+                    yield line.decode('utf-8', errors='replace')
 
     @staticmethod
     def _parse_hf_xet_progress(line: str) -> Optional[Dict[str, Any]]:
@@ -742,7 +794,7 @@ class DownloadManager:
         if not line.startswith(XET_PROGRESS_PREFIX):
             return None
         try:
-            payload = json.loads(line[len(XET_PROGRESS_PREFIX):])
+            payload = _json_loads(line[len(XET_PROGRESS_PREFIX):])
             phase = str(payload.get('phase') or '')
             current = max(0, int(payload.get('current') or 0))
             total = max(0, int(payload.get('total') or 0))
@@ -957,7 +1009,7 @@ class DownloadManager:
         except Exception:
             pass
         # Reap the child. Without this the zombie keeps the reader thread's pipe
-        # fd alive, so a worker blocked in read(1) never sees EOF and the
+        # fd alive, so a worker blocked in read() never sees EOF and the
         # ThreadPoolExecutor atexit hook can hang interpreter shutdown forever.
         try:
             process.wait(timeout=grace)
@@ -989,8 +1041,44 @@ class DownloadManager:
             pass
         return ''
 
+    def _hf_repo_file_sizes(self, repo_id: str, branch: str) -> Optional[Dict[str, int]]:
+        """Sizes of every file in a repo revision, fetched once and cached.
+
+        The revision API lists all siblings (with their LFS sizes) in a single
+        round-trip, so N files from one repo cost one metadata call instead of
+        N HEADs. None when the listing is unavailable (callers fall back to HEAD).
+        """
+        key = (repo_id, branch)
+        with self._hf_sizes_lock:
+            if key in self._hf_sizes_cache:
+                return self._hf_sizes_cache[key]
+        sizes: Optional[Dict[str, int]] = None
+        try:
+            from urllib.parse import quote
+            url = f"https://huggingface.co/api/models/{repo_id}/revision/{quote(branch, safe='')}"
+            headers = {'User-Agent': HTTP_USER_AGENT}
+            token = self._effective_hf_token()
+            if token:
+                headers['Authorization'] = f'Bearer {token}'
+            resp = _api_session().get(url, params={'blobs': 'true'}, headers=headers, timeout=15)
+            if resp.status_code < 400:
+                sizes = {}
+                for sibling in resp.json().get('siblings') or []:
+                    name = sibling.get('rfilename')
+                    size = (sibling.get('lfs') or {}).get('size', sibling.get('size'))
+                    if name and isinstance(size, int):
+                        sizes[name] = size
+            else:
+                logger.debug(f"Listagem de {repo_id}@{branch} devolveu HTTP {resp.status_code}")
+        except Exception:
+            sizes = None
+        with self._hf_sizes_lock:
+            self._hf_sizes_cache[key] = sizes
+        return sizes
+
     def _hf_remote_size(self, repo_id: str, branch: str, file_path: str) -> Optional[int]:
-        """Best-effort total file size via a HEAD on the resolve URL (for % display).
+        """Best-effort total file size (for % display), from the cached repo
+        listing when possible, else via a HEAD on the resolve URL.
         Non-fatal: returns None on any problem (we then report bytes/speed only).
 
         The status code MUST be checked: an error response carries its own tiny
@@ -999,6 +1087,9 @@ class DownloadManager:
         the ``st_size >= expected_size`` completeness gate accept any truncated
         payload as a finished model.
         """
+        listed = (self._hf_repo_file_sizes(repo_id, branch) or {}).get(file_path)
+        if listed is not None:
+            return listed
         try:
             from urllib.parse import quote
             url = f"https://huggingface.co/{repo_id}/resolve/{branch}/{quote(file_path)}"
@@ -1006,7 +1097,7 @@ class DownloadManager:
             token = self._effective_hf_token()
             if token:
                 headers['Authorization'] = f'Bearer {token}'
-            resp = requests.head(url, headers=headers, allow_redirects=True, timeout=15)
+            resp = _api_session().head(url, headers=headers, allow_redirects=True, timeout=15)
             if resp.status_code >= 400:
                 logger.debug(
                     f"HEAD {repo_id}/{file_path} devolveu HTTP {resp.status_code}; "
@@ -1989,7 +2080,7 @@ class DownloadManager:
         process: Optional[subprocess.Popen] = None
         watchdog: Optional[threading.Thread] = None
         try:
-            process = subprocess.Popen(
+            process = _spawn_process(
                 cmd, env=env, stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT, bufsize=0,
             )
@@ -2085,7 +2176,7 @@ class DownloadManager:
                     'requires', 'not found', 'failed', 'traceback', 'restricted',
                 )):
                     logger.info(f"  [hf] {self._sanitize_log(stripped)}")
-                else:
+                elif logger.isEnabledFor(logging.DEBUG):
                     logger.debug(f"  [hf] {self._sanitize_log(stripped)}")
 
             process.wait()
@@ -2171,7 +2262,7 @@ class DownloadManager:
         process: Optional[subprocess.Popen] = None
         watchdog: Optional[threading.Thread] = None
         try:
-            process = subprocess.Popen(
+            process = _spawn_process(
                 cmd, env=env, stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT, bufsize=0,
             )
@@ -2276,7 +2367,9 @@ class DownloadManager:
             f'--timeout={read_to}',
             '--dir', str(dest_dir),
         ]
-        
+        if self.aria2_disable_ipv6:
+            cmd.append('--disable-ipv6=true')
+
         # Add speed limit if configured (I7: bandwidth throttling)
         if self.speed_limit != '0':
             cmd.extend(['--max-download-limit', self.speed_limit])
@@ -2309,7 +2402,7 @@ class DownloadManager:
         process: Optional[subprocess.Popen] = None
         try:
             # Use binary mode + unbuffered for CR-aware progress reading
-            process = subprocess.Popen(
+            process = _spawn_process(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
@@ -2382,7 +2475,7 @@ class DownloadManager:
                         line_lower = stripped.lower()
                         if any(kw in line_lower for kw in ('error', 'download', 'redirect', 'connect', 'warning', 'exception')):
                             logger.info(f"  [aria2c] {self._sanitize_log(stripped)}")
-                        else:
+                        elif logger.isEnabledFor(logging.DEBUG):
                             logger.debug(f"  [aria2c] {self._sanitize_log(stripped)}")
 
                 # Guard against stalled aria2c sessions (e.g., DL:0B forever)
@@ -2499,7 +2592,7 @@ class DownloadManager:
         process: Optional[subprocess.Popen] = None
         try:
             # Use binary mode + unbuffered for CR-aware progress reading
-            process = subprocess.Popen(
+            process = _spawn_process(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
@@ -2564,7 +2657,7 @@ class DownloadManager:
                     line_lower = stripped.lower()
                     if any(kw in line_lower for kw in ('error', 'failed', 'redirect', 'location', 'saving')):
                         logger.info(f"  [wget] {self._sanitize_log(stripped)}")
-                    elif stripped and not stripped.startswith('%'):
+                    elif stripped and not stripped.startswith('%') and logger.isEnabledFor(logging.DEBUG):
                         logger.debug(f"  [wget] {self._sanitize_log(stripped)}")
 
                 # Stall timeout for wget
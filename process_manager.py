@@ -4,12 +4,17 @@ Process Manager - ComfyUI lifecycle management
 Start, stop, restart ComfyUI with configurable flags
 """
 
+import errno
 import os
+import select
 import signal
+import socket
 import subprocess
 import logging
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 from typing import List, Optional, Dict, Tuple
 import psutil
@@ -50,6 +55,132 @@ COMFY_PORT = _env_int('COMFY_PORT', 8818)
 STARTUP_PROBE_TIMEOUT = 2
 
 
+_health_local = threading.local()
+
+
+def _health_session() -> requests.Session:
+    """
+    Keep-alive session for ComfyUI health checks, one per thread.
+
+    Module-level because ProcessManager instances are short-lived (the web
+    server builds one per status poll), so a per-instance pool was thrown
+    away after a single probe. Per thread because requests.Session is not
+    safe to share between concurrent request handlers.
+    """
+    session = getattr(_health_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0))
+        _health_local.session = session
+    return session
+
+
+def _port_accepts_connections(port: int, timeout: float = 0.2) -> bool:
+    """
+    True when something accepts TCP connections on 127.0.0.1:`port`.
+
+    Anything other than a refusal (e.g. a listener too busy to finish the
+    handshake) counts as in use. A refusal only covers loopback: see
+    _port_has_listener().
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        return sock.connect_ex(('127.0.0.1', port)) != errno.ECONNREFUSED
+
+
+def _port_has_listener(port: int) -> bool:
+    """
+    True when anything listens on `port`, whatever address it is bound to.
+
+    The loopback connect probe settles the usual case without walking the
+    socket table. A refusal is not proof the port is free: a `--listen` flag
+    from a preset can bind one specific address, and a foreign process may
+    hold only the container IP or '::'. Those are found by the psutil scan.
+    """
+    if _port_accepts_connections(port):
+        return True
+    try:
+        return any(
+            conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port == port
+            for conn in psutil.net_connections(kind='inet')
+        )
+    except Exception as e:
+        logger.warning(f"Could not inspect listeners on port {port}: {e}")
+        return False
+
+
+def merge_flags(*flag_lists: Optional[List[str]]) -> List[str]:
+    """
+    Merge CLI flag lists left to right; a repeated flag replaces the earlier one.
+
+    A '--flag' followed by a non-'--' token forms a pair, so `--port 8818` then
+    `--port 9000` leaves only `--port 9000`. A flag sits where it last appeared
+    and stray positional tokens are kept. One pass, keyed by flag name.
+    """
+    tokens = [token for flags in flag_lists if flags for token in flags]
+    merged: Dict[object, List[str]] = {}
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.startswith('--'):
+            has_value = i + 1 < len(tokens) and not tokens[i + 1].startswith('--')
+            merged.pop(token, None)
+            merged[token] = tokens[i:i + 2] if has_value else [token]
+            i += 2 if has_value else 1
+        else:
+            merged[i] = [token]
+            i += 1
+    return [token for entry in merged.values() for token in entry]
+
+
+def _wait_for_exit(pids: List[int], timeout: float) -> Optional[bool]:
+    """
+    Block until every PID in `pids` has exited or `timeout` elapses.
+
+    Sleeps in the kernel on pidfds (Linux 5.3+) instead of a poll loop. Returns
+    True once all exited, False on timeout, and None where pidfds are not
+    available so the caller can fall back to polling. Nothing is reaped here:
+    waitid() would steal the exit status from Popen/psutil, so callers still
+    collect it themselves — instantly, once this returns True.
+    """
+    if not hasattr(os, 'pidfd_open'):
+        return None
+    pidfds: List[int] = []
+    try:
+        for pid in pids:
+            try:
+                pidfds.append(os.pidfd_open(pid))
+            except ProcessLookupError:
+                continue  # already gone
+            except OSError:
+                return None
+        deadline = time.monotonic() + timeout
+        pending = pidfds
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select(pending, [], [], remaining)
+            pending = [fd for fd in pending if fd not in ready]
+        return True
+    finally:
+        for fd in pidfds:
+            os.close(fd)
+
+
+def _sleep_unless_exited(pid: int, timeout: float) -> None:
+    """
+    Sleep up to `timeout` seconds, waking as soon as `pid` exits.
+
+    A crash during startup is noticed the moment it happens rather than at
+    the next poll tick. Falls back to a plain sleep without pidfd support.
+    """
+    if timeout <= 0:
+        return
+    if _wait_for_exit([pid], timeout) is None:
+        time.sleep(timeout)
+
+
 class ProcessManager:
     """Manages ComfyUI process lifecycle"""
 
@@ -90,21 +221,38 @@ class ProcessManager:
         """Check if PID exists and is not a zombie."""
         if not pid:
             return False
+        # Fast path: one read of /proc/<pid>/stat instead of building a
+        # psutil.Process. The state letter follows the last ')' because the
+        # command name itself may contain parentheses or spaces.
+        try:
+            with open(f'/proc/{int(pid)}/stat', 'rb') as f:
+                state = f.read().rsplit(b')', 1)[1].split()[0]
+            return state not in (b'Z', b'X', b'x')
+        except (FileNotFoundError, ProcessLookupError):
+            return False
+        except (OSError, IndexError, ValueError):
+            pass  # no procfs here; ask psutil
         try:
             process = psutil.Process(pid)
             return process.is_running() and process.status() != psutil.STATUS_ZOMBIE
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             return False
 
-    def _find_port_owner_pid(self, port: int) -> Optional[int]:
-        """Return PID that owns a listening socket on the target port."""
+    def _find_port_owner_pids(self, ports: List[int]) -> Dict[int, Optional[int]]:
+        """Map each listening port in `ports` to its owner PID in one socket-table scan."""
+        wanted = set(ports)
+        owners: Dict[int, Optional[int]] = {}
         try:
             for conn in psutil.net_connections(kind='inet'):
-                if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port == port:
-                    return conn.pid
+                if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port in wanted:
+                    owners.setdefault(conn.laddr.port, conn.pid)
         except Exception as e:
-            logger.warning(f"Could not inspect port owner for {port}: {e}")
-        return None
+            logger.warning(f"Could not inspect port owner for {sorted(wanted)}: {e}")
+        return owners
+
+    def _find_port_owner_pid(self, port: int) -> Optional[int]:
+        """Return PID that owns a listening socket on the target port."""
+        return self._find_port_owner_pids([port]).get(port)
 
     @staticmethod
     def _cmdline_is_comfy_server(cmdline: List[str]) -> bool:
@@ -119,13 +267,14 @@ class ProcessManager:
         if not cmdline:
             return False
         tokens = [str(t).lower() for t in cmdline]
-        joined = ' '.join(tokens)
         basenames = {os.path.basename(t) for t in tokens}
         # comfy-cli wrapper: "<python> .../bin/comfy --workspace <dir> launch -- ..."
         if 'launch' in tokens and any(b.startswith('comfy') for b in basenames):
             return True
         # ComfyUI itself: "<python> .../ComfyUI/main.py --port <n> ..."
-        if 'main.py' in basenames and ('comfyui' in joined or '--port' in tokens):
+        if 'main.py' in basenames and (
+            '--port' in tokens or any('comfyui' in t for t in tokens)
+        ):
             return True
         return False
 
@@ -207,6 +356,8 @@ class ProcessManager:
                     return
                 proc.wait(timeout=1)
             else:
+                if _wait_for_exit([proc.pid], timeout) is False:
+                    return
                 proc.wait(timeout=timeout)
         except subprocess.TimeoutExpired:
             return
@@ -247,7 +398,11 @@ class ProcessManager:
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 pass
 
-        _, alive = psutil.wait_procs(targets, timeout=timeout)
+        # Block on pidfds until the tree is gone; psutil then only collects
+        # exit statuses instead of polling for the whole grace period.
+        deadline = time.monotonic() + timeout
+        _wait_for_exit([proc.pid for proc in targets], timeout)
+        _, alive = psutil.wait_procs(targets, timeout=max(deadline - time.monotonic(), 0.1))
         if alive:
             logger.warning(
                 f"{len(alive)} process(es) in tree of PID {pid} did not stop in {timeout}s, "
@@ -345,8 +500,10 @@ class ProcessManager:
         """Check if ComfyUI is responding"""
         port = self._resolve_port(port)
         try:
-            response = requests.get(
-                f"http://localhost:{port}/system_stats",
+            # ComfyUI listens on 0.0.0.0; the IPv4 literal skips resolving
+            # localhost (which may also try ::1 first).
+            response = _health_session().get(
+                f"http://127.0.0.1:{port}/system_stats",
                 timeout=timeout
             )
             return response.status_code == 200
@@ -411,45 +568,7 @@ class ProcessManager:
             logger.info(f"Adding preset-specific flags: {preset_flags}")
         
         # Merge: defaults + preset flags + explicit flags (last wins)
-        all_flags = default_flags.copy()
-        all_flags.extend(preset_flags)
-        if flags:
-            all_flags.extend(flags)
-        
-        # Deduplicate while preserving order (later values override).
-        # Flags starting with '--' followed by a non-'--' token form a pair.
-        seen: Dict[str, int] = {}
-        deduped: List[str] = []
-        i = 0
-        while i < len(all_flags):
-            token = all_flags[i]
-            if token.startswith('--'):
-                # Check if next token is a value (not another flag)
-                has_value = (i + 1 < len(all_flags) and not all_flags[i + 1].startswith('--'))
-                if token in seen:
-                    # Remove previous occurrence (and its value if any)
-                    prev = seen[token]
-                    prev_has_value = (prev + 1 < len(deduped) and not deduped[prev + 1].startswith('--'))
-                    if prev_has_value:
-                        del deduped[prev:prev + 2]
-                    else:
-                        del deduped[prev:prev + 1]
-                    # Recompute indices for remaining entries
-                    seen.clear()
-                    for j, t in enumerate(deduped):
-                        if t.startswith('--'):
-                            seen[t] = j
-                seen[token] = len(deduped)
-                deduped.append(token)
-                if has_value:
-                    deduped.append(all_flags[i + 1])
-                    i += 2
-                else:
-                    i += 1
-            else:
-                deduped.append(token)
-                i += 1
-        flags = deduped
+        flags = merge_flags(default_flags, preset_flags, flags)
         
         logger.info(f"Starting ComfyUI on port {port} with flags: {flags}")
         
@@ -459,8 +578,9 @@ class ProcessManager:
                 COMFY_CLI,
                 '--workspace', str(COMFY_DIR),
                 'launch',
-                '--'
-            ] + flags
+                '--',
+                *flags,
+            ]
 
             # Ensure runtime env for Blackwell + SageAttention stability.
             env = os.environ.copy()
@@ -492,6 +612,8 @@ class ProcessManager:
             # This allows real-time log viewing and prevents Python buffering issues.
             # start_new_session puts comfy-cli and its ComfyUI grandchild in a
             # dedicated process group, so stop() can take the whole tree down.
+            # That (and cwd) keeps this launch off CPython's posix_spawn path;
+            # it still goes through vfork, so no page-table copy of this parent.
             self.process = subprocess.Popen(
                 cmd,
                 cwd=str(COMFY_DIR),
@@ -515,6 +637,10 @@ class ProcessManager:
             # budget, not an iteration count.
             logger.info(f"Waiting for ComfyUI to start (timeout: {COMFY_STARTUP_TIMEOUT}s)...")
             deadline = time.monotonic() + COMFY_STARTUP_TIMEOUT
+            # Poll fast right after launch (an immediate crash or a warm start
+            # is caught in ~100ms) and back off towards 1s; the probe timeout
+            # grows with the delay so a busy-but-alive server still gets answered.
+            delay = 0.1
             while True:
                 remaining = deadline - time.monotonic()
                 if remaining <= 0:
@@ -530,7 +656,8 @@ class ProcessManager:
                         clear_pid=True
                     )
                     return False
-                if self.health_check(port=port, timeout=min(STARTUP_PROBE_TIMEOUT, remaining)):
+                probe_timeout = min(STARTUP_PROBE_TIMEOUT, remaining, delay * 2)
+                if self.health_check(port=port, timeout=probe_timeout):
                     self.state_manager.set_comfyui_status(
                         status="running",
                         pid=child_pid,
@@ -544,7 +671,8 @@ class ProcessManager:
                     print("="*60 + "\n")
                     logger.info(f"✓ ComfyUI started successfully on port {port}")
                     return True
-                time.sleep(min(1.0, max(deadline - time.monotonic(), 0)))
+                _sleep_unless_exited(child_pid, min(delay, deadline - time.monotonic()))
+                delay = min(1.0, delay * 1.5)
 
             # Timeout: the launch did not answer inside the budget, but it is
             # still alive (poll() above would have caught an exit). Record what
@@ -615,6 +743,7 @@ class ProcessManager:
         logger.info(f"Waiting for port {port} to be released...")
         released = False
         deadline = time.monotonic() + max(timeout, 1)
+        delay = 0.1
         while time.monotonic() < deadline:
             owner_pid = self._find_port_owner_pid(port)
             if owner_pid is None:
@@ -632,7 +761,8 @@ class ProcessManager:
                 logger.warning(
                     f"Port {port} still owned by non-Comfy PID {owner_pid}; waiting."
                 )
-            time.sleep(1)
+            time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+            delay = min(1.0, delay * 2)
 
         if not released:
             owner_pid = self._find_port_owner_pid(port)
@@ -681,8 +811,27 @@ class ProcessManager:
 
 
     def _is_port_in_use(self, port: int) -> bool:
-        """Check if a listening process owns this port."""
-        return self._find_port_owner_pid(port) is not None
+        """Check if something is listening on this port, on any address."""
+        return _port_has_listener(port)
+
+    def wait_port_free(self, port: Optional[int] = None, timeout: float = 5.0) -> bool:
+        """
+        Wait until nothing listens on `port`, returning as soon as it is free.
+
+        Replaces a fixed pause between stop and start: the listener is usually
+        gone within a few hundred ms, and a slow release still gets `timeout`.
+        """
+        port = self._resolve_port(port)
+        deadline = time.monotonic() + timeout
+        delay = 0.01
+        while _port_has_listener(port):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Port {port} still in use after {timeout:.0f}s")
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(0.5, delay * 2)
+        return True
     
     def restart(self, flags: Optional[List[str]] = None, port: Optional[int] = None) -> bool:
         """Restart ComfyUI with optional new flags"""
@@ -696,8 +845,7 @@ class ProcessManager:
                 logger.error("Failed to stop ComfyUI for restart")
                 return False
 
-        # Wait a bit
-        time.sleep(2)
+        self.wait_port_free(port)
 
         # Start with new flags
         return self.start(flags=flags, port=port)
@@ -31,6 +31,16 @@ _recent: list = []
 # other's message and the UI shows whichever wrote last.
 _stages: Dict[str, str] = {}
 _counts: Dict[str, int] = {'done': 0, 'total': 0}
+# Bumped by every writer; snapshot() rebuilds only when it moved, so idle
+# polls between download ticks reuse the previous copy.
+_version = 0
+_snapshot_cache: Optional[tuple] = None
+
+
+def _changed() -> None:
+    """Mark the registry as modified. Caller holds ``_lock``."""
+    global _version
+    _version += 1
 
 
 def reset() -> None:
@@ -40,6 +50,7 @@ def reset() -> None:
         _recent.clear()
         _stages.clear()
         _counts.update({'done': 0, 'total': 0})
+        _changed()
 
 
 def set_stage(stage: str, detail: str = "") -> None:
@@ -54,6 +65,7 @@ def set_stage(stage: str, detail: str = "") -> None:
             _stages[lane] = str(detail)
         else:
             _stages.pop(lane, None)
+        _changed()
 
 
 def set_counts(done: int, total: int) -> None:
@@ -61,6 +73,7 @@ def set_counts(done: int, total: int) -> None:
     with _lock:
         _counts['done'] = max(0, int(done))
         _counts['total'] = max(0, int(total))
+        _changed()
 
 
 def set_download(filename: str, current: int, total: Optional[int],
@@ -79,6 +92,7 @@ def set_download(filename: str, current: int, total: Optional[int],
         entry['speed_bps'] = max(0.0, float(speed_bps or 0.0))
         entry['backend'] = str(backend or entry.get('backend') or '')
         entry['updated_at'] = time.time()
+        _changed()
 
 
 def finish_download(filename: str, ok: bool, reason: str = "") -> None:
@@ -92,15 +106,25 @@ def finish_download(filename: str, ok: bool, reason: str = "") -> None:
         entry['finished_at'] = time.time()
         _recent.append(entry)
         del _recent[:-_MAX_RECENT]
+        _changed()
 
 
 def snapshot() -> Dict[str, Any]:
-    """Return a deep-enough copy for JSON serialization."""
+    """Return a deep-enough copy for JSON serialization.
+
+    The copy is shared between callers until the next write; treat it as
+    read-only.
+    """
+    global _snapshot_cache
     with _lock:
-        return {
+        if _snapshot_cache is not None and _snapshot_cache[0] == _version:
+            return _snapshot_cache[1]
+        data = {
             'stages': dict(_stages),
             'done': _counts['done'],
             'total': _counts['total'],
             'active': [dict(e) for e in _downloads.values()],
             'recent': [dict(e) for e in _recent],
         }
+        _snapshot_cache = (_version, data)
+        return data
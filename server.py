@@ -4,24 +4,61 @@ Web Server - Minimal preset selector interface
 Serves web UI and handles installation requests
 """
 
+import gzip
+import hashlib
 import json
 import logging
 import math
+import mimetypes
 import os
+import queue
+import selectors
 import signal
+import socket
 import threading
+import time
 from http.server import HTTPServer, ThreadingHTTPServer, SimpleHTTPRequestHandler
 from pathlib import Path
-from typing import Callable, List
+from typing import AbstractSet, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
+import process_manager
+import start
 from state import get_state_manager
 
 logger = logging.getLogger(__name__)
 
+# Directories this module serves from, resolved once at import.
+SCRIPT_DIR = Path(__file__).parent.absolute()
+WEB_DIR = SCRIPT_DIR / 'web'
+WORKFLOWS_DIR = SCRIPT_DIR / 'workflows'
+
 # Module-level state
 _presets_callback = None
 _state_manager = None
 
+# Last /api/presets body, reused while presets/ and the installed set are
+# unchanged. The UI refetches the list on every install/uninstall and focus.
+_presets_cache = {'key': None, 'body': b'', 'gzip': b'', 'etag': ''}
+_presets_cache_lock = threading.Lock()
+PRESETS_SIGNATURE_TTL = 0.1
+_presets_signature_cache: Tuple[float, tuple] = (0.0, ())
+
+# is_running() can fall back to an HTTP probe of ComfyUI; every open tab
+# polls /api/status, so one answer serves all polls within this window.
+STATUS_RUNNING_TTL = 1.0
+_running_cache: Tuple[float, bool] = (0.0, False)
+
+# Taken (never released) by the first POST /api/shutdown, so later requests
+# do not spawn more shutdown work.
+_shutdown_claim = threading.Lock()
+
+# web/ assets held in memory, {url path: (file, (mtime_ns, size), (body,
+# content type, etag, gzipped body or b''))}. Filled by run_server(); an entry
+# is re-read when its file changes on disk, and a path missing here falls
+# through to the disk handler.
+_static_assets: Dict[str, Tuple[Path, Tuple[int, int], Tuple[bytes, str, str, bytes]]] = {}
+
 # COMFY_PORT is the single source of truth for which port ComfyUI uses; a
 # recorded value wins only when one was actually recorded.
 try:
@@ -32,77 +69,262 @@ except ValueError:
     logger.warning("COMFY_PORT inválido; usando 8818")
     COMFY_PORT = 8818
 
+# Upper bound on concurrent request handlers. Polls, preflights and static
+# assets are short; long jobs (install, restart, shutdown) run on their own
+# threads, so a small fixed pool is enough and cannot be stormed.
+HTTP_MAX_WORKERS = 16
+# Parked keep-alive connections with no new request for this long are closed.
+KEEPALIVE_IDLE_SECONDS = 30
+# JSON bodies smaller than this are sent as-is: gzip framing would eat the win.
+GZIP_MIN_BYTES = 1024
+# Per-request bodies (status polls) favour speed; cached bodies are compressed
+# once per change at the default level instead.
+GZIP_LEVEL = 1
+# Largest POST body accepted.
+MAX_BODY_BYTES = 64 * 1024
+
 try:
     import progress as progress_registry
     HAS_PROGRESS = True
 except ImportError:
     HAS_PROGRESS = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
-def serialize_presets(presets: List[dict], installed_presets: set[str]) -> List[dict]:
+def _json_dumps(payload) -> bytes:
+    """Encode a response body, with orjson when it is installed."""
+    if HAS_ORJSON:
+        # Non-str keys are stringified, as json.dumps does.
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload).encode()
+
+
+def _json_loads(body: bytes):
+    """Decode a request body straight from bytes (no intermediate str)."""
+    if HAS_ORJSON:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _serialize_preset(name: str, preset: dict, installed: bool) -> dict:
+    """Public view of one preset: UI metadata with unsafe values defaulted."""
+    raw_workflows = preset.get('workflows')
+    if not isinstance(raw_workflows, list):
+        raw_workflows = [{
+            'label': 'Workflow',
+            'file': preset.get('workflow', ''),
+            'url': preset.get('workflow_url', ''),
+        }]
+    workflows = []
+    for workflow in raw_workflows:
+        if not isinstance(workflow, dict):
+            continue
+        filename = workflow.get('file', '')
+        url = f'/api/workflows/{filename}' if filename else workflow.get('url', '')
+        if url:
+            workflows.append({
+                'label': workflow.get('label', 'Workflow'),
+                'url': url,
+                'local': bool(filename),
+                'file': filename,
+            })
+
+    raw_size = preset.get('size_gb')
+    size_gb = (
+        raw_size
+        if isinstance(raw_size, (int, float))
+        and not isinstance(raw_size, bool)
+        and math.isfinite(raw_size)
+        and raw_size > 0
+        else None
+    )
+    raw_modified = preset.get('_modified_at')
+    modified_at = (
+        int(raw_modified)
+        if isinstance(raw_modified, (int, float))
+        and not isinstance(raw_modified, bool)
+        and math.isfinite(raw_modified)
+        else 0
+    )
+    return {
+        'name': name,
+        'description': preset.get('description', ''),
+        'models_count': len(preset.get('models', ())),
+        'nodes_count': len(preset.get('nodes', ())),
+        'installed': installed,
+        'workflows': workflows,
+        'pinned': preset.get('pinned') is True,
+        'size_gb': size_gb,
+        'modified_at': modified_at,
+    }
+
+
+def serialize_presets(presets: List[dict], installed_presets: AbstractSet[str]) -> List[dict]:
     """Return the public preset data used by the web UI."""
-    clean_presets = []
-    for preset in presets:
-        name = preset.get('name', preset.get('_filename', 'Unknown'))
-        if name.lower() == 'base':
+    return [
+        _serialize_preset(name, preset, name in installed_presets)
+        for preset in presets
+        if (name := preset.get('name', preset.get('_filename', 'Unknown'))).lower() != 'base'
+    ]
+
+
+def _presets_signature() -> tuple:
+    """
+    Cheap fingerprint of presets/: every preset file name with its mtime.
+
+    One scandir pass, reused for PRESETS_SIGNATURE_TTL seconds so a burst of
+    polls does not rescan the directory on every request.
+    """
+    global _presets_signature_cache
+    now = time.monotonic()
+    expires, signature = _presets_signature_cache
+    if now < expires:
+        return signature
+    try:
+        # start owns the presets directory; looked up per call so both
+        # modules always agree on it.
+        with os.scandir(start.PRESETS_DIR) as entries:
+            signature = tuple(sorted(
+                (entry.name, entry.stat().st_mtime_ns)
+                for entry in entries if entry.name.endswith('.json')
+            ))
+    except OSError:
+        signature = ()
+    _presets_signature_cache = (now + PRESETS_SIGNATURE_TTL, signature)
+    return signature
+
+
+def _cached_presets_response() -> dict:
+    """
+    Return the encoded /api/presets body and its ETag, rebuilding them only
+    when presets/ or the installed set changed since the last call.
+    """
+    state = _state_manager or get_state_manager()
+    installed_presets = state.get_installed_presets_set()
+    key = (_presets_callback, _presets_signature(), installed_presets)
+    with _presets_cache_lock:
+        if _presets_cache['key'] == key:
+            return dict(_presets_cache)
+    presets = _presets_callback() if _presets_callback else []
+    body = _json_dumps({'presets': serialize_presets(presets, installed_presets)})
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    cached = {'key': key, 'body': body, 'gzip': _gzip_variant(body), 'etag': etag}
+    with _presets_cache_lock:
+        _presets_cache.update(cached)
+    return cached
+
+
+def _is_str_list(value) -> bool:
+    """True for a JSON array whose items are all strings."""
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def _cached_is_running(state) -> bool:
+    """ProcessManager.is_running(), reused for STATUS_RUNNING_TTL seconds."""
+    global _running_cache
+    now = time.monotonic()
+    expires, running = _running_cache
+    if now < expires:
+        return running
+    running = process_manager.ProcessManager(state).is_running()
+    _running_cache = (now + STATUS_RUNNING_TTL, running)
+    return running
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of `etag` against an If-None-Match list (RFC 9110)."""
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+def _gzip_etag(etag: str) -> str:
+    """Validator of the gzip representation of `etag`'s body.
+
+    A gzipped body is a different representation (RFC 9110 §8.8.3), so it
+    cannot share the strong ETag of the identity one.
+    """
+    return etag[:-1] + '-gz"'
+
+
+def _gzip_variant(body: bytes) -> bytes:
+    """Gzipped copy of a cacheable body, or b'' when it is too small to gain."""
+    if len(body) < GZIP_MIN_BYTES:
+        return b''
+    return gzip.compress(body, mtime=0)
+
+
+def _load_static_asset(path: Path) -> Optional[Tuple[Path, Tuple[int, int], Tuple[bytes, str, str, bytes]]]:
+    """Read one web/ file into a _static_assets entry, or None if unreadable."""
+    try:
+        # Stat before reading: a write racing the read leaves a stale stamp,
+        # so the next request reloads instead of keeping a torn body.
+        st = path.stat()
+        body = path.read_bytes()
+    except OSError as e:
+        logger.warning(f"Asset {path.name} não carregado em memória: {e}")
+        return None
+    content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    textual = content_type.startswith('text/') or content_type in (
+        'application/javascript', 'application/json', 'image/svg+xml')
+    gzipped = _gzip_variant(body) if textual else b''
+    return path, (st.st_mtime_ns, st.st_size), (body, content_type, etag, gzipped)
+
+
+def _load_static_assets(web_dir: Path) -> Dict[str, Tuple[Path, Tuple[int, int], Tuple[bytes, str, str, bytes]]]:
+    """Read every file under web/ once so assets are served without disk I/O."""
+    assets = {}
+    for path in sorted(web_dir.rglob('*')):
+        if not path.is_file():
             continue
+        entry = _load_static_asset(path)
+        if entry:
+            assets['/' + path.relative_to(web_dir).as_posix()] = entry
+    if '/index.html' in assets:
+        assets['/'] = assets['/index.html']
+    return assets
 
-        raw_workflows = preset.get('workflows')
-        if not isinstance(raw_workflows, list):
-            raw_workflows = [{
-                'label': 'Workflow',
-                'file': preset.get('workflow', ''),
-                'url': preset.get('workflow_url', ''),
-            }]
-        workflows = []
-        for workflow in raw_workflows:
-            if not isinstance(workflow, dict):
-                continue
-            filename = workflow.get('file', '')
-            url = f'/api/workflows/{filename}' if filename else workflow.get('url', '')
-            if url:
-                workflows.append({
-                    'label': workflow.get('label', 'Workflow'),
-                    'url': url,
-                    'local': bool(filename),
-                    'file': filename,
-                })
 
-        raw_size = preset.get('size_gb')
-        size_gb = (
-            raw_size
-            if isinstance(raw_size, (int, float))
-            and not isinstance(raw_size, bool)
-            and math.isfinite(raw_size)
-            and raw_size > 0
-            else None
-        )
-        raw_modified = preset.get('_modified_at')
-        modified_at = (
-            int(raw_modified)
-            if isinstance(raw_modified, (int, float))
-            and not isinstance(raw_modified, bool)
-            and math.isfinite(raw_modified)
-            else 0
-        )
-        clean_presets.append({
-            'name': name,
-            'description': preset.get('description', ''),
-            'models_count': len(preset.get('models', [])),
-            'nodes_count': len(preset.get('nodes', [])),
-            'installed': name in installed_presets,
-            'workflows': workflows,
-            'pinned': preset.get('pinned') is True,
-            'size_gb': size_gb,
-            'modified_at': modified_at,
-        })
-    return clean_presets
-
-
-def _comfy_port(state) -> int:
-    """Recorded port if there is one, else COMFY_PORT."""
+def _static_asset(url_path: str) -> Optional[Tuple[bytes, str, str, bytes]]:
+    """Preloaded asset for `url_path`, re-read first if its file changed.
+
+    One stat() per request keeps edits under web/ live without a restart; a
+    file that vanished falls through to the disk handler (and its 404).
+    """
+    entry = _static_assets.get(url_path)
+    if entry is None:
+        return None
+    path, stamp, asset = entry
     try:
-        recorded = state.get_comfyui_status().get('port')
+        st = path.stat()
+    except OSError:
+        _static_assets.pop(url_path, None)
+        return None
+    if (st.st_mtime_ns, st.st_size) != stamp:
+        entry = _load_static_asset(path)
+        if entry is None:
+            _static_assets.pop(url_path, None)
+            return None
+        _static_assets[url_path] = entry
+        asset = entry[2]
+    return asset
+
+
+def _comfy_port(state, status: Optional[dict] = None) -> int:
+    """Recorded port if there is one, else COMFY_PORT.
+
+    Pass `status` when the caller already read get_comfyui_status().
+    """
+    try:
+        recorded = (status if status is not None else state.get_comfyui_status()).get('port')
     except Exception:
         recorded = None
     return int(recorded) if recorded else COMFY_PORT
@@ -110,15 +332,12 @@ def _comfy_port(state) -> int:
 
 def _shutdown_runtime(terminate_process: bool = False):
     """Cancel active installation, then exclusively stop the runtime."""
-    from start import MODELS_DIR, reserve_shutdown_slot
-
-    with reserve_shutdown_slot():
+    with start.reserve_shutdown_slot():
         from downloader import cleanup_incomplete_downloads
-        from process_manager import ProcessManager
 
-        cleanup_incomplete_downloads(MODELS_DIR)
+        cleanup_incomplete_downloads(start.MODELS_DIR)
         state = _state_manager or get_state_manager()
-        pm = ProcessManager(state)
+        pm = process_manager.ProcessManager(state)
         if pm.is_running():
             logger.info("Stopping ComfyUI before shutdown...")
             pm.ensure_stopped(port=_comfy_port(state), timeout=15)
@@ -128,12 +347,210 @@ def _shutdown_runtime(terminate_process: bool = False):
 
 class PresetHandler(SimpleHTTPRequestHandler):
     """HTTP handler for preset selector"""
-    
+
+    # Persistent connections: the UI polls /api/status and loads its assets
+    # over one socket instead of a TCP handshake per request. Every response
+    # must therefore carry Content-Length. Under PooledHTTPServer an idle
+    # connection is parked off the pool between requests; the timeout only
+    # bounds a client that stalls halfway through sending one.
+    protocol_version = 'HTTP/1.1'
+    timeout = 15
+    # Set after a request when the client wants the connection kept open.
+    keep_alive = False
+    # Small JSON replies must not wait on Nagle for the client's delayed ACK.
+    disable_nagle_algorithm = True
+    # Buffer the response so the header block and body leave in one send();
+    # handle_one_request() flushes after every request.
+    wbufsize = 64 * 1024
+
+    # Exact path -> handler method name. GET routes match without the query.
+    _GET_ROUTES = {
+        '/api/presets': '_handle_get_presets',
+        '/api/status': '_handle_get_status',
+    }
+    _POST_ROUTES = {
+        '/api/install': '_handle_install',
+        '/api/uninstall': '_handle_uninstall',
+        '/api/restart': '_handle_restart',
+        '/api/cancel': '_handle_cancel',
+        '/api/shutdown': '_handle_shutdown',
+    }
+
     def __init__(self, *args, **kwargs):
         # Serve from web/ directory
-        web_dir = Path(__file__).parent / 'web'
-        super().__init__(*args, directory=str(web_dir), **kwargs)
-    
+        super().__init__(*args, directory=WEB_DIR, **kwargs)
+
+    def setup(self):
+        super().setup()
+        # Long-lived polling sockets: let the kernel drop peers that vanished.
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+    def handle(self):
+        """Serve one request when the server parks idle connections.
+
+        The stdlib loops until the client closes, pinning a pool worker to an
+        idle keep-alive socket. PooledHTTPServer instead calls resume() when
+        the next request arrives.
+        """
+        if not getattr(self.server, 'parks_idle_connections', False):
+            super().handle()
+            return
+        self.keep_alive = False
+        self.close_connection = True
+        self.handle_one_request()
+        self.keep_alive = not self.close_connection
+
+    def resume(self):
+        """Serve the next request on a parked connection."""
+        try:
+            self.handle()
+        finally:
+            self.finish()
+
+    def finish(self):
+        # A parked connection keeps its buffered rfile/wfile for resume().
+        if not self.keep_alive:
+            super().finish()
+
+    def has_buffered_request(self) -> bool:
+        """True when a pipelined request already sits in rfile's buffer.
+
+        select() cannot see bytes that were read off the socket already.
+        """
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def _accepts_gzip(self) -> bool:
+        """True when the client advertised gzip without refusing it (q=0)."""
+        for coding in self.headers.get('Accept-Encoding', '').split(','):
+            name, _, params = coding.strip().partition(';')
+            if name.strip().lower() == 'gzip':
+                return params.replace(' ', '') not in ('q=0', 'q=0.0')
+        return False
+
+    def _send_json(self, code: int, payload):
+        """Send `payload` as JSON with an explicit Content-Length."""
+        self._send_json_body(code, _json_dumps(payload))
+
+    def _send_json_body(self, code: int, body: bytes, etag: str = '', gzipped: bytes = b''):
+        """Send an already-encoded JSON body.
+
+        Bodies past GZIP_MIN_BYTES are gzipped for clients that accept it; the
+        preset list and status polls cross the cloud provider's proxy each time.
+        `gzipped` is a precompressed copy of `body` from a cache.
+        """
+        compressible = len(body) >= GZIP_MIN_BYTES
+        compressed = compressible and self._accepts_gzip()
+        if compressed:
+            body = gzipped or gzip.compress(body, compresslevel=GZIP_LEVEL)
+            if etag:
+                etag = _gzip_etag(etag)
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        if compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+        if compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        if etag:
+            # Cacheable, but always revalidated: a 304 is all a poll costs.
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_not_modified(self, etag: str, vary: bool = False) -> bool:
+        """Answer 304 when the client already holds `etag`; True if sent.
+
+        `vary` marks a body served gzipped to clients that accept it; those
+        hold the gzip representation's ETag.
+        """
+        if vary and self._accepts_gzip():
+            etag = _gzip_etag(etag)
+        if not _etag_matches(self.headers.get('If-None-Match', ''), etag):
+            return False
+        self.send_response(304)
+        if vary:
+            self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('ETag', etag)
+        self.end_headers()
+        return True
+
+    def _send_static(self, body: bytes, content_type: str, etag: str, gzipped: bytes):
+        """Send a preloaded web asset; browsers revalidate it via its ETag."""
+        if self._send_not_modified(etag, vary=bool(gzipped)):
+            return
+        compressed = bool(gzipped) and self._accepts_gzip()
+        if compressed:
+            body = gzipped
+            etag = _gzip_etag(etag)
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        if gzipped:
+            self.send_header('Vary', 'Accept-Encoding')
+        if compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def copyfile(self, source, outputfile):
+        """Stream a file body with sendfile(), kernel to socket.
+
+        Headers still sitting in the write buffer go out first.
+        """
+        outputfile.flush()
+        self.connection.sendfile(source)
+
+    def _read_json_body(self):
+        """
+        Read and decode the request's JSON body.
+
+        Returns None once an error response (411/400/413) has been sent,
+        including for an empty body, malformed JSON or a body that is not an
+        object: the POST endpoints act on what the body names, and defaulting
+        an empty one to {} made a bare POST /api/install install Base.
+        """
+        cl = self.headers.get('Content-Length')
+        if not cl:
+            self.send_error(411, 'Content-Length required')
+            return None
+        try:
+            content_length = int(cl)
+            if content_length < 0:
+                raise ValueError(cl)
+        except ValueError:
+            self.send_error(400, 'Invalid Content-Length')
+            return None
+        if content_length > MAX_BODY_BYTES:
+            self.send_error(413, 'Request body too large')
+            return None
+        if content_length == 0:
+            self.send_error(400, 'Request body required')
+            return None
+        self._body_consumed = True
+        try:
+            data = _json_loads(self.rfile.read(content_length))
+        except ValueError:
+            self.send_error(400, 'Invalid JSON body')
+            return None
+        if not isinstance(data, dict):
+            self.send_error(400, 'JSON body must be an object')
+            return None
+        return data
+
+    def end_headers(self):
+        # CORS in one place: every response, errors and 304s included.
+        self.send_header('Access-Control-Allow-Origin', '*')
+        super().end_headers()
+
     def _send_json_error(self, code: int, message: str):
         """Reply with a JSON error carrying no internal detail.
 
@@ -141,13 +558,8 @@ class PresetHandler(SimpleHTTPRequestHandler):
         filesystem paths, internal types — to unauthenticated clients, defeating
         the project's log-sanitization convention.
         """
-        body = json.dumps({'error': message}).encode()
         try:
-            self.send_response(code)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            self._send_json(code, {'error': message})
         except Exception:
             pass
 
@@ -158,53 +570,67 @@ class PresetHandler(SimpleHTTPRequestHandler):
     
     def do_GET(self):
         """Handle GET requests"""
-        if self.path == '/api/presets':
-            self._handle_get_presets()
-        elif self.path == '/api/status':
-            self._handle_get_status()
-        elif self.path.startswith('/api/workflows/'):
-            filename = self.path[len('/api/workflows/'):]
-            self._handle_get_workflow(filename)
+        path = urlsplit(self.path).path
+        handler = self._GET_ROUTES.get(path)
+        if handler:
+            getattr(self, handler)()
+        elif path.startswith('/api/workflows/'):
+            self._handle_get_workflow(path[len('/api/workflows/'):])
         else:
-            # Serve static files
-            super().do_GET()
+            # Serve static files, from memory when preloaded
+            asset = _static_asset(path)
+            if asset:
+                self._send_static(*asset)
+            else:
+                super().do_GET()
     
     def do_POST(self):
         """Handle POST requests"""
-        if self.path == '/api/install':
-            self._handle_install()
-        elif self.path == '/api/uninstall':
-            self._handle_uninstall()
-        elif self.path == '/api/restart':
-            self._handle_restart()
-        elif self.path == '/api/cancel':
-            self._handle_cancel()
-        elif self.path == '/api/shutdown':
-            self._handle_shutdown()
+        self._body_consumed = False
+        handler = self._POST_ROUTES.get(self.path)
+        if handler:
+            getattr(self, handler)()
         else:
             self.send_error(404)
+        self._discard_unread_body()
+
+    def _discard_unread_body(self):
+        """Drop a request body the route did not read.
+
+        On a keep-alive connection leftover body bytes would be parsed as the
+        next request line. Small bodies are drained; anything else (chunked,
+        oversized, bad Content-Length) closes the connection instead.
+        """
+        if self._body_consumed:
+            return
+        if self.headers.get('Transfer-Encoding'):
+            self.close_connection = True
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if 0 <= length <= MAX_BODY_BYTES:
+            if length:
+                self.rfile.read(length)
+        else:
+            self.close_connection = True
     
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_response(204)
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Max-Age', '86400')
         self.end_headers()
     
     def _handle_get_presets(self):
         """Return available presets with installation status"""
         try:
-            presets = _presets_callback() if _presets_callback else []
-            state = _state_manager or get_state_manager()
-            installed_presets = set(state.get_installed_presets())
-            clean_presets = serialize_presets(presets, installed_presets)
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({'presets': clean_presets}).encode())
+            cached = _cached_presets_response()
+            if self._send_not_modified(cached['etag'], vary=len(cached['body']) >= GZIP_MIN_BYTES):
+                return
+            self._send_json_body(200, cached['body'], etag=cached['etag'], gzipped=cached['gzip'])
         
         except Exception as e:
             logger.error(f"Failed to get presets: {e}")
@@ -218,20 +644,20 @@ class PresetHandler(SimpleHTTPRequestHandler):
                 self.send_error(400, 'Invalid filename')
                 return
 
-            workflows_dir = Path(__file__).parent / 'workflows'
-            workflow_path = workflows_dir / filename
+            workflow_path = WORKFLOWS_DIR / filename
 
             if not workflow_path.exists():
                 self.send_error(404, 'Workflow not found')
                 return
 
-            content = workflow_path.read_bytes()
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(content)
+            with open(workflow_path, 'rb') as workflow_file:
+                size = os.fstat(workflow_file.fileno()).st_size
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+                self.send_header('Content-Length', str(size))
+                self.end_headers()
+                self.copyfile(workflow_file, self.wfile)
 
         except Exception as e:
             logger.error(f"Failed to serve workflow {filename}: {e}")
@@ -241,21 +667,14 @@ class PresetHandler(SimpleHTTPRequestHandler):
         """Return ComfyUI status"""
         try:
             state = _state_manager or get_state_manager()
-            from process_manager import ProcessManager
-            pm = ProcessManager(state)
-            is_running = pm.is_running()
+            is_running = _cached_is_running(state)
             status_data = state.get_comfyui_status()
-            from start import get_install_status
-            install_data = get_install_status()
+            install_data = start.get_install_status()
 
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
             payload = {
                 'running': is_running,
                 'status': status_data.get('status', 'unknown'),
-                'port': _comfy_port(state),
+                'port': _comfy_port(state, status_data),
                 'installed_presets': state.get_installed_presets(),
                 **install_data,
             }
@@ -264,7 +683,12 @@ class PresetHandler(SimpleHTTPRequestHandler):
             # WebSocket listener could never reach the browser.
             if HAS_PROGRESS:
                 payload['progress'] = progress_registry.snapshot()
-            self.wfile.write(json.dumps(payload).encode())
+            # Idle polls keep producing the same bytes; let them revalidate.
+            body = _json_dumps(payload)
+            etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            if self._send_not_modified(etag, vary=len(body) >= GZIP_MIN_BYTES):
+                return
+            self._send_json_body(200, body, etag=etag)
         except Exception as e:
             logger.error(f"Failed to get status: {e}")
             self._send_json_error(500, "Falha ao obter status")
@@ -273,10 +697,7 @@ class PresetHandler(SimpleHTTPRequestHandler):
         """Handle ComfyUI restart request (kill + start with last preset flags)"""
         restart_reserved = False
         try:
-            from process_manager import ProcessManager
-            from start import finish_restart_reservation, reserve_restart_slot
-
-            if not reserve_restart_slot():
+            if not start.reserve_restart_slot():
                 self._send_json_error(
                     409, "Instalação em andamento; reinicie o ComfyUI depois que ela terminar."
                 )
@@ -286,7 +707,7 @@ class PresetHandler(SimpleHTTPRequestHandler):
 
             def do_restart():
                 try:
-                    pm = ProcessManager(state)
+                    pm = process_manager.ProcessManager(state)
                     logger.info("Restart requested via web UI")
 
                     # Stop ComfyUI
@@ -294,8 +715,7 @@ class PresetHandler(SimpleHTTPRequestHandler):
                         logger.error("Failed to stop ComfyUI for restart")
                         return
 
-                    import time
-                    time.sleep(2)
+                    pm.wait_port_free(_comfy_port(state))
 
                     # Start with existing preset flags from state
                     started = pm.start()
@@ -306,67 +726,50 @@ class PresetHandler(SimpleHTTPRequestHandler):
                 except Exception as e:
                     logger.error(f"Restart thread error: {e}")
                 finally:
-                    finish_restart_reservation()
+                    start.finish_restart_reservation()
 
             thread = threading.Thread(target=do_restart, daemon=True)
             try:
                 thread.start()
             except Exception:
-                finish_restart_reservation()
+                start.finish_restart_reservation()
                 restart_reserved = False
                 raise
             restart_reserved = False
 
-            self.send_response(202)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            self._send_json(202, {
                 'success': True,
                 'message': 'Restart initiated'
-            }).encode())
+            })
         except Exception as e:
             if restart_reserved:
-                finish_restart_reservation()
+                start.finish_restart_reservation()
             logger.error(f"Restart error: {e}")
             self._send_json_error(500, "Erro interno do servidor")
 
     def _handle_install(self):
         """Handle preset installation request"""
         try:
-            cl = self.headers.get('Content-Length')
-            if not cl:
-                self.send_error(411, 'Content-Length required')
+            data = self._read_json_body()
+            if data is None:
                 return
-            content_length = int(cl)
-            max_body_size = 1 * 1024 * 1024  # 1 MB
-            if content_length > max_body_size:
-                self.send_error(413, 'Request body too large')
+
+            if 'presets' not in data:
+                self.send_error(400, 'Missing "presets" field')
                 return
-            body = self.rfile.read(content_length)
-            data = json.loads(body.decode())
-            
-            preset_names = data.get('presets', [])
+            preset_names = data['presets']
             extra_flags = data.get('extra_flags', [])
+            if not _is_str_list(preset_names) or not _is_str_list(extra_flags):
+                self.send_error(400, '"presets" and "extra_flags" must be lists of strings')
+                return
             logger.info(f"Installation request: {preset_names} (extra flags: {extra_flags})")
 
             # Start installation in background thread
-            from start import (
-                finish_install_reservation,
-                install_presets,
-                reserve_install_slot,
-            )
-            from process_manager import ProcessManager
-
-            if not reserve_install_slot():
-                self.send_response(409)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps({
+            if not start.reserve_install_slot():
+                self._send_json(409, {
                     'success': False,
                     'error': 'Já existe uma instalação em andamento.'
-                }).encode())
+                })
                 return
 
             def install_and_restart():
@@ -374,7 +777,7 @@ class PresetHandler(SimpleHTTPRequestHandler):
                 install_slot_finished = False
                 try:
                     state = _state_manager or get_state_manager()
-                    pm = ProcessManager(state)
+                    pm = process_manager.ProcessManager(state)
 
                     # STEP 1: Always ensure ComfyUI is stopped (including stale PID state)
                     logger.info("Ensuring ComfyUI is stopped before installation...")
@@ -388,7 +791,7 @@ class PresetHandler(SimpleHTTPRequestHandler):
                     # STEP 2: Install presets (this also saves preset flags to state)
                     logger.info(f"Installing presets: {preset_names}")
                     install_presets_called = True
-                    success = install_presets(
+                    success = start.install_presets(
                         preset_names,
                         include_base=True,
                         _slot_reserved=True,
@@ -403,8 +806,7 @@ class PresetHandler(SimpleHTTPRequestHandler):
                         # `success` means launchable, not flawless: an install
                         # missing a gated LoRA still starts, and the pending
                         # preset records what to resume.
-                        from start import get_install_status
-                        partial = get_install_status().get(
+                        partial = start.get_install_status().get(
                             'install_status') == 'completed_with_failures'
                         print("\n" + "="*60)
                         if partial:
@@ -419,7 +821,7 @@ class PresetHandler(SimpleHTTPRequestHandler):
                         started = pm.restart(flags=extra_flags if extra_flags else None)
                         if started:
                             logger.info("✓ ComfyUI started successfully")
-                            finish_install_reservation(
+                            start.finish_install_reservation(
                                 'completed_with_failures' if partial else 'completed')
                             install_slot_finished = True
                         else:
@@ -427,33 +829,29 @@ class PresetHandler(SimpleHTTPRequestHandler):
                                 "ComfyUI failed to start after installation — "
                                 "check logs above for startup timeout or port conflict"
                             )
-                            finish_install_reservation('start_failed')
+                            start.finish_install_reservation('start_failed')
                             install_slot_finished = True
                     else:
                         print("\n" + "="*60)
                         print("\033[1;31m❌ ERRO NA INSTALAÇÃO ❌\033[0m")
                         print("="*60 + "\n")
                         logger.error("Installation failed")
-                        finish_install_reservation('failed')
+                        start.finish_install_reservation('failed')
                         install_slot_finished = True
                 except Exception as e:
                     logger.error(f"Install thread error: {e}")
                 finally:
                     if not install_presets_called or not install_slot_finished:
-                        finish_install_reservation('failed')
+                        start.finish_install_reservation('failed')
             
             thread = threading.Thread(target=install_and_restart, daemon=True)
             thread.start()
             
             # Send immediate response
-            self.send_response(202)  # Accepted
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            self._send_json(202, {
                 'success': True,
                 'message': 'Installation started'
-            }).encode())
+            })
         
         except Exception as e:
             logger.error(f"Installation error: {e}")
@@ -462,17 +860,12 @@ class PresetHandler(SimpleHTTPRequestHandler):
     def _handle_cancel(self):
         """Cancel an in-progress installation (interrupts active downloads)."""
         try:
-            from start import cancel_active_install
-            cancelled = bool(cancel_active_install())
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            cancelled = bool(start.cancel_active_install())
+            self._send_json(200, {
                 'success': True,
                 'cancelled': cancelled,
                 'message': 'Cancelamento solicitado' if cancelled else 'Nenhuma instalação ativa no momento'
-            }).encode())
+            })
         except Exception as e:
             logger.error(f"Cancel error: {e}")
             self._send_json_error(500, "Erro interno do servidor")
@@ -480,48 +873,32 @@ class PresetHandler(SimpleHTTPRequestHandler):
     def _handle_uninstall(self):
         """Handle preset uninstall request — deletes models specific to a preset"""
         try:
-            cl = self.headers.get('Content-Length')
-            if not cl:
-                self.send_error(411, 'Content-Length required')
+            data = self._read_json_body()
+            if data is None:
                 return
-            content_length = int(cl)
-            if content_length > 1024 * 1024:
-                self.send_error(413, 'Request body too large')
-                return
-            body = self.rfile.read(content_length)
-            data = json.loads(body.decode())
 
-            preset_name = (data.get('preset') or '').strip()
+            preset_name = data.get('preset')
+            preset_name = preset_name.strip() if isinstance(preset_name, str) else ''
             if not preset_name:
                 self.send_error(400, 'Missing "preset" field')
                 return
 
             logger.info(f"Uninstall request: {preset_name}")
 
-            from start import reserve_uninstall_slot, uninstall_preset
-
             # Serialize every mutable preset operation so an install or another
             # uninstall cannot race this removal.
-            with reserve_uninstall_slot() as reserved:
+            with start.reserve_uninstall_slot() as reserved:
                 if not reserved:
-                    self.send_response(409)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({
+                    self._send_json(409, {
                         'success': False,
                         'error': 'Instalação em andamento — aguarde a conclusão antes de remover.'
-                    }).encode())
+                    })
                     return
 
-                result = uninstall_preset(preset_name)
+                result = start.uninstall_preset(preset_name)
 
             status_code = 200 if result.get('success') else 400
-            self.send_response(status_code)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
+            self._send_json(status_code, result)
 
         except Exception as e:
             logger.error(f"Uninstall error: {e}")
@@ -530,18 +907,21 @@ class PresetHandler(SimpleHTTPRequestHandler):
     def _handle_shutdown(self):
         """Handle Arrakis Start shutdown request"""
         try:
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            # Repeated clicks must not stack shutdown threads; the first one
+            # already ends the process.
+            if not _shutdown_claim.acquire(blocking=False):
+                self._send_json(200, {
+                    'success': True,
+                    'message': 'Shutdown already in progress'
+                })
+                return
+            self._send_json(200, {
                 'success': True,
                 'message': 'Shutdown initiated'
-            }).encode())
+            })
 
             def do_shutdown():
                 try:
-                    import time
                     time.sleep(0.5)
                     logger.info("Shutdown requested via web UI")
                     _shutdown_runtime(terminate_process=True)
@@ -558,24 +938,165 @@ class PresetHandler(SimpleHTTPRequestHandler):
             self._send_json_error(500, "Erro interno do servidor")
 
 
+class PooledHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that hands requests to a fixed worker pool.
+
+    The stock mixin spawns one thread per connection with no cap. A worker
+    serves one request and then parks a keep-alive connection on a selector,
+    so idle tabs hold a file descriptor rather than a worker: a browser keeps
+    up to six connections per host, so three open tabs could otherwise pin
+    all HTTP_MAX_WORKERS until the handler timeout. Workers are
+    daemon threads, so — like `daemon_threads` — a handler blocked on a slow
+    client never holds up process exit.
+    """
+
+    daemon_threads = True
+    # listen() backlog; the stdlib default of 5 refuses connections when a page
+    # load and several tabs' polls arrive together.
+    request_queue_size = 128
+    parks_idle_connections = True
+
+    def __init__(self, *args, max_workers: int = HTTP_MAX_WORKERS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._connections: queue.Queue = queue.Queue()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f'http-worker-{i}', daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+        # Workers hand connections to the parking thread through _to_park and
+        # wake its select() with a byte on _wakeup.
+        self._selector = selectors.DefaultSelector()
+        self._to_park: queue.Queue = queue.Queue()
+        self._wakeup, self._wakeup_reader = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._selector.register(self._wakeup_reader, selectors.EVENT_READ)
+        self._closing = False
+        # Set under _park_lock once the parking thread stopped taking handlers;
+        # from then on _park closes connections itself.
+        self._park_lock = threading.Lock()
+        self._park_closed = False
+        self._parking = threading.Thread(target=self._park_loop, name='http-parking', daemon=True)
+        self._parking.start()
+
+    def _worker(self):
+        while True:
+            item = self._connections.get()
+            if item is None:
+                return
+            if isinstance(item, tuple):
+                request, client_address = item
+                handler = None
+                try:
+                    handler = self.RequestHandlerClass(request, client_address, self)
+                except Exception:
+                    self.handle_error(request, client_address)
+            else:
+                handler = item
+                request = handler.request
+                try:
+                    handler.resume()
+                except Exception:
+                    self.handle_error(request, handler.client_address)
+            if handler is not None and handler.keep_alive and not self._closing:
+                self._park(handler)
+            else:
+                self.shutdown_request(request)
+
+    def _park(self, handler):
+        with self._park_lock:
+            if not self._park_closed:
+                if handler.has_buffered_request():
+                    self._connections.put(handler)
+                else:
+                    self._to_park.put(handler)
+                    try:
+                        self._wakeup.send(b'\0')
+                    except OSError:
+                        pass
+                return
+        self._close_parked(handler)
+
+    def _park_loop(self):
+        parked: Dict[socket.socket, Tuple] = {}
+        while not self._closing:
+            for key, _ in self._selector.select(timeout=1.0):
+                if key.fileobj is self._wakeup_reader:
+                    try:
+                        self._wakeup_reader.recv(4096)
+                    except OSError:
+                        pass
+                    continue
+                self._selector.unregister(key.fileobj)
+                handler, _ = parked.pop(key.fileobj)
+                self._connections.put(handler)
+            while True:
+                try:
+                    handler = self._to_park.get_nowait()
+                except queue.Empty:
+                    break
+                parked[handler.request] = (handler, time.monotonic())
+                self._selector.register(handler.request, selectors.EVENT_READ)
+            deadline = time.monotonic() - KEEPALIVE_IDLE_SECONDS
+            for conn, (handler, since) in list(parked.items()):
+                if since < deadline:
+                    self._selector.unregister(conn)
+                    del parked[conn]
+                    self._close_parked(handler)
+        with self._park_lock:
+            self._park_closed = True
+        for handler, _ in parked.values():
+            self._close_parked(handler)
+        while not self._to_park.empty():
+            self._close_parked(self._to_park.get_nowait())
+        self._selector.close()
+
+    def _close_parked(self, handler):
+        handler.keep_alive = False
+        handler.finish()
+        self.shutdown_request(handler.request)
+
+    def process_request(self, request, client_address):
+        self._connections.put((request, client_address))
+
+    def server_close(self):
+        super().server_close()
+        self._closing = True
+        try:
+            self._wakeup.send(b'\0')
+        except OSError:
+            pass
+        self._parking.join(timeout=5)
+        self._wakeup.close()
+        self._wakeup_reader.close()
+        for _ in self._workers:
+            self._connections.put(None)
+
+
 def run_server(port: int = 8090, presets_callback: Callable = None):
     """Run the HTTP server"""
     global _presets_callback, _state_manager
     _presets_callback = presets_callback
     _state_manager = get_state_manager()
+    _static_assets.update(_load_static_assets(WEB_DIR))
+    # Build the preset list now so the first page load does not pay for it.
+    try:
+        _cached_presets_response()
+    except Exception as e:
+        logger.warning(f"Failed to pre-build presets response: {e}")
 
-    # ThreadingHTTPServer handles concurrent API requests; daemon_threads lets
-    # handler threads die with the process.
+    # A bounded pool handles concurrent API requests; its daemon workers die
+    # with the process.
     try:
-        server = ThreadingHTTPServer(('0.0.0.0', port), PresetHandler)
+        server = PooledHTTPServer(('0.0.0.0', port), PresetHandler)
     except OSError as e:
         logger.error(
             f"Não foi possível abrir a porta {port} ({e}). Provavelmente outro "
             "Arrakis Start já está rodando; pare-o antes de subir este."
         )
         raise SystemExit(1)
-    server.daemon_threads = True
-    
+
     # Colorful startup banner
     print("\n" + "="*60)
     print("\033[1;35m🌐 ARRAKIS START WEBUI INICIADA! 🌐\033[0m")
@@ -596,8 +1117,7 @@ def run_server(port: int = 8090, presets_callback: Callable = None):
     except KeyboardInterrupt:
         logger.info("\nShutting down server...")
         try:
-            from start import cancel_active_install
-            cancel_active_install()
+            start.cancel_active_install()
         except Exception as e:
             logger.warning(f"Failed to cancel active install during shutdown: {e}")
     finally:
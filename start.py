@@ -5,6 +5,9 @@ Main orchestrator for preset-based installation with state management
 """
 
 import contextlib
+import copy
+import functools
+from collections import deque
 import os
 import sys
 import json
@@ -26,7 +29,7 @@ import argparse
 
 # Import state manager
 from state import get_state_manager
-from process_manager import get_process_manager
+from process_manager import get_process_manager, merge_flags
 
 # In-process progress registry surfaced through /api/status. Optional: the
 # installer must keep working if the module is absent (older deployments).
@@ -35,6 +38,11 @@ try:
 except ImportError:  # pragma: no cover - progress reporting is best-effort
     progress = None
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -87,6 +95,9 @@ NODES_CLONE_WORKERS = _safe_int_env('NODES_CLONE_WORKERS', 6)
 # real liveness guard; the wall-clock value below is just a backstop for a child
 # that spins forever without ever going quiet.
 NODE_PIP_TIMEOUT_SECONDS = _safe_int_env('NODE_PIP_TIMEOUT_SECONDS', 1800)
+# Backstop for the single pip run over every node's requirements. Scaling the
+# per-node value by the node count let one hung resolver block for hours.
+NODE_PIP_COMBINED_TIMEOUT_SECONDS = _safe_int_env('NODE_PIP_COMBINED_TIMEOUT_SECONDS', 3600)
 NODE_PIP_STALL_SECONDS = _safe_int_env('NODE_PIP_STALL_SECONDS', 300)
 
 # Deadlines. Every long-running child gets one: without a deadline a silent pip
@@ -104,6 +115,9 @@ IMPORT_PROBE_TIMEOUT_SECONDS = _safe_int_env('IMPORT_PROBE_TIMEOUT_SECONDS', 180
 # that inherited the pipe (e.g. a backgrounded build step) can hold the write
 # end open forever, so the drain must be bounded instead of waiting for EOF.
 STREAM_DRAIN_GRACE_SECONDS = 5.0
+# Output lines kept per streamed command. Callers only report the tail, and a
+# verbose pip build would otherwise hold its whole log in memory.
+STREAM_OUTPUT_TAIL_LINES = 200
 
 # GitHub token for private repositories (GITHUB_TOKEN or GH_TOKEN)
 GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN', '') or os.environ.get('GH_TOKEN', '')
@@ -128,17 +142,29 @@ def _reset_progress() -> None:
         pass
 
 
+# Cloud template interpreters (VastAI / Runpod pre-built images).
+TEMPLATE_PYTHONS = (Path('/venv/main/bin/python'), Path('/venv/comfy/bin/python'))
+# COMFY_PYTHON once seen to exist; it stays valid for the process.
+_resolved_comfy_python: Optional[str] = None
+
+
 def _resolve_comfy_python() -> Optional[str]:
     """Return the ComfyUI venv python if it exists, else None.
 
     Checks the configured COMFY_PYTHON first, then probes common cloud-template
     locations (/venv/main, etc.) in case comfy-cli targets a different venv.
+    Only COMFY_PYTHON is remembered: a template fallback is re-checked on
+    every call, so a ComfyUI venv created later in the run still takes over.
     """
+    global _resolved_comfy_python
+    if _resolved_comfy_python:
+        return _resolved_comfy_python
+
     if COMFY_PYTHON.exists():
-        return str(COMFY_PYTHON)
+        _resolved_comfy_python = str(COMFY_PYTHON)
+        return _resolved_comfy_python
 
-    # Cloud template fallbacks (VastAI / Runpod pre-built images)
-    for alt in (Path('/venv/main/bin/python'), Path('/venv/comfy/bin/python')):
+    for alt in TEMPLATE_PYTHONS:
         if alt.exists():
             logger.info(f"Using template runtime Python: {alt}")
             return str(alt)
@@ -248,6 +274,15 @@ def _sanitize_git_output(text: str) -> str:
     return text
 
 
+# Last load_presets() result and the _presets_cache_key() it was read under.
+_load_presets_cache: Dict[str, Any] = {'key': None, 'presets': []}
+_load_presets_lock = threading.Lock()
+# Parsed preset files, {path: (mtime_ns, size, preset)}: when one file changes
+# the others are not read or decoded again. Entries share nested objects with
+# _load_presets_cache, which only ever hands out deep copies.
+_preset_file_cache: Dict[str, Tuple[int, int, Any]] = {}
+
+
 def should_ignore_preset_file(preset_file: Path) -> bool:
     """Return True when a preset file is intentionally disabled/hidden."""
     name = preset_file.name
@@ -274,11 +309,13 @@ def preset_modified_timestamps() -> Dict[str, float]:
     """Map preset filename to the latest committed modification timestamp."""
     timestamps: Dict[str, float] = {}
     try:
-        result = subprocess.run(
+        result = _run_probe(
             ['git', '-C', str(SCRIPT_DIR), 'log', '--format=%ct',
              '--name-only', '--', 'presets'],
-            capture_output=True, text=True, timeout=15)
-        if result.returncode != 0:
+            15,
+            'git log presets',
+        )
+        if result is None or result.returncode != 0:
             return timestamps
         current_ts = 0.0
         for line in result.stdout.splitlines():
@@ -294,8 +331,48 @@ def preset_modified_timestamps() -> Dict[str, float]:
     return timestamps
 
 
+def _presets_cache_key() -> Optional[tuple]:
+    """
+    Fingerprint of everything load_presets() reads: the preset files (name,
+    mtime, size) and the git index, whose mtime moves on every commit/pull that
+    could re-date a preset. None when presets/ cannot be listed.
+    """
+    try:
+        files = []
+        with os.scandir(PRESETS_DIR) as entries:
+            for entry in entries:
+                st = entry.stat()
+                files.append((entry.name, st.st_mtime_ns, st.st_size))
+    except OSError:
+        return None
+    try:
+        git_index = (SCRIPT_DIR / '.git' / 'index').stat().st_mtime_ns
+    except OSError:
+        git_index = None
+    return (str(PRESETS_DIR), tuple(sorted(files)), git_index)
+
+
 def load_presets() -> List[Dict]:
-    """Load all preset JSON files from presets/, newest modified first."""
+    """
+    Load all preset JSON files from presets/, newest modified first.
+
+    The parsed list is cached until _presets_cache_key() changes, so repeated
+    calls skip the `git log` and the JSON parsing. The list is shared between
+    callers until then; treat it as read-only.
+    """
+    key = _presets_cache_key()
+    with _load_presets_lock:
+        if key is not None and _load_presets_cache['key'] == key:
+            return _load_presets_cache['presets']
+    presets = _read_presets()
+    if key is not None:
+        with _load_presets_lock:
+            _load_presets_cache.update(key=key, presets=presets)
+    return presets
+
+
+def _read_presets() -> List[Dict]:
+    """Read and parse presets/ from disk (uncached)."""
     presets = []
 
     if not PRESETS_DIR.exists():
@@ -313,21 +390,42 @@ def load_presets() -> List[Dict]:
             ts = 0.0
         return (-ts, preset_file.name.lower())
 
-    for preset_file in sorted(PRESETS_DIR.iterdir(), key=modified_order):
-        if not preset_file.is_file() or should_ignore_preset_file(preset_file):
-            continue
+    preset_files = [
+        preset_file for preset_file in sorted(PRESETS_DIR.iterdir(), key=modified_order)
+        if preset_file.is_file() and not should_ignore_preset_file(preset_file)
+    ]
+
+    def read_preset(preset_file: Path) -> Optional[Dict]:
         try:
-            with open(preset_file, 'r', encoding='utf-8') as f:
-                preset = json.load(f)
-                preset['_filename'] = preset_file.name
-                modified_at = modified.get(preset_file.name)
-                if modified_at is None:
-                    modified_at = preset_file.stat().st_mtime
-                preset['_modified_at'] = modified_at
-                presets.append(preset)
+            st = preset_file.stat()
+            cached = _preset_file_cache.get(str(preset_file))
+            if cached is None or cached[:2] != (st.st_mtime_ns, st.st_size):
+                cached = (st.st_mtime_ns, st.st_size, _json_loads(preset_file.read_bytes()))
+                _preset_file_cache[str(preset_file)] = cached
+            # Top-level copy: _filename/_modified_at must not touch the cache.
+            preset = copy.copy(cached[2])
+            preset['_filename'] = preset_file.name
+            modified_at = modified.get(preset_file.name)
+            if modified_at is None:
+                modified_at = st.st_mtime
+            preset['_modified_at'] = modified_at
+            if logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"Loaded preset: {preset.get('name', preset_file.name)}")
+            return preset
         except Exception as e:
             logger.error(f"Failed to load preset {preset_file}: {e}")
+            return None
+
+    # On a cold network volume every read is a round trip; overlap them.
+    # map() keeps the modified-first order.
+    if preset_files:
+        with ThreadPoolExecutor(max_workers=min(16, len(preset_files))) as ex:
+            presets = [preset for preset in ex.map(read_preset, preset_files) if preset is not None]
+
+    live = {str(preset_file) for preset_file in preset_files}
+    for path in list(_preset_file_cache):
+        if path not in live:
+            _preset_file_cache.pop(path, None)
 
     names = ", ".join(p.get('name', p['_filename']) for p in presets)
     logger.info(f"Presets carregados ({len(presets)}): {names}")
@@ -552,19 +650,27 @@ def cancel_active_install(delete_partials: bool = False):
 def _run_probe(
     cmd: List[str],
     timeout: int,
-    description: str
+    description: str,
+    capture_stdout: bool = True,
 ) -> Optional[subprocess.CompletedProcess]:
     """Run a short diagnostic command with a hard deadline.
 
     Returns None when the probe could not be completed (missing binary, crash,
     or timeout). A probe that hangs — a wedged `import torch`, an unresponsive
-    nvidia-smi — must never stall the installer.
+    nvidia-smi — must never stall the installer. Without `capture_stdout` the
+    child's stdout goes to /dev/null and only stderr is piped back.
     """
+    # Absolute executable + close_fds=False lets CPython use posix_spawn
+    # instead of fork+exec; Python-created fds are non-inheritable anyway.
+    if not os.path.dirname(cmd[0]):
+        cmd = [shutil.which(cmd[0]) or cmd[0], *cmd[1:]]
     try:
         return subprocess.run(
             cmd,
             check=False,
-            capture_output=True,
+            close_fds=False,
+            stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             text=True,
             timeout=timeout,
         )
@@ -576,8 +682,21 @@ def _run_probe(
         return None
 
 
+# At least one of these exists wherever the NVIDIA kernel driver is loaded,
+# containers included (the runtime bind-mounts the device nodes).
+NVIDIA_DRIVER_PATHS = ('/proc/driver/nvidia/version', '/dev/nvidiactl', '/dev/nvidia0')
+
+
 def _cuda_available() -> bool:
-    """Check CUDA availability using ComfyUI runtime python."""
+    """Check CUDA availability using ComfyUI runtime python.
+
+    Without the NVIDIA driver torch cannot see a GPU, so CPU-only hosts answer
+    False without paying for an `import torch` in a subprocess. Not memoized:
+    a pip command can replace torch, so _ConditionProbes caches the answer per
+    install and drops it after every command it runs.
+    """
+    if not any(os.path.exists(path) for path in NVIDIA_DRIVER_PATHS):
+        return False
     probe = _run_probe(
         [_comfy_python(), '-c', 'import torch; print(int(torch.cuda.is_available()))'],
         IMPORT_PROBE_TIMEOUT_SECONDS,
@@ -605,8 +724,13 @@ def _version_pair(value: Optional[str]) -> Optional[Tuple[int, int]]:
         return None
 
 
+@functools.lru_cache(maxsize=1)
 def _driver_max_cuda() -> Optional[str]:
-    """Max CUDA version the installed driver supports (nvidia-smi header)."""
+    """Max CUDA version the installed driver supports (nvidia-smi header).
+
+    Memoized: the loaded kernel driver cannot change under a running process,
+    and the torch compatibility check alone asked three times.
+    """
     if not shutil.which('nvidia-smi'):
         return None
     out = _run_probe(['nvidia-smi'], PROBE_TIMEOUT_SECONDS, 'nvidia-smi')
@@ -749,11 +873,18 @@ def _ensure_torch_driver_compatible() -> None:
         logger.info(f"✓ torch compatível com o driver após reinstalar de {index_url}")
 
 
+@functools.lru_cache(maxsize=128)
+def _split_command(command: str) -> Tuple[str, ...]:
+    """shlex.split, memoized: batching and the install loop both normalize
+    the same preset strings."""
+    return tuple(shlex.split(command))
+
+
 def _normalize_pip_command(command: Any) -> List[str]:
     """Normalize preset pip command into a safe argv list."""
     target_python = _comfy_python()
     if isinstance(command, str):
-        tokens = shlex.split(command)
+        tokens = list(_split_command(command))
     elif isinstance(command, list):
         tokens = [str(x) for x in command if str(x).strip()]
     else:
@@ -926,9 +1057,10 @@ def _stream_command(
 ) -> Tuple[int, List[str], str]:
     """Run a cancellable child, streaming its output with progress heartbeats.
 
-    Returns (returncode, collected_lines, last_line). returncode is -2 when the
-    install was cancelled and -1 when the deadline expired or the child could not
-    be reaped.
+    Returns (returncode, collected_lines, last_line). collected_lines keeps only
+    the last STREAM_OUTPUT_TAIL_LINES lines. returncode is -2 when the install
+    was cancelled and -1 when the deadline expired or the child could not be
+    reaped.
 
     ``timeout_sec`` bounds total wall-clock; ``stall_sec`` (when set) bounds time
     without progress, where progress is any output line or any CPU/IO movement.
@@ -956,7 +1088,7 @@ def _stream_command(
     _register_install_process(proc)
     assert proc.stdout is not None
 
-    output_lines: List[str] = []
+    output_lines: "deque[str]" = deque(maxlen=STREAM_OUTPUT_TAIL_LINES)
     output_queue: "queue.Queue[str]" = queue.Queue()
     reader_done = threading.Event()
     # Set when the main loop stops consuming: the reader keeps draining so an
@@ -1145,7 +1277,7 @@ def _stream_command(
         returncode = proc.returncode
     if abandoned and returncode == 0:
         logger.info(f"[{log_prefix}] {description} terminou com sucesso (saída abandonada)")
-    return returncode, output_lines, last_line
+    return returncode, list(output_lines), last_line
 
 
 def _run_streaming_command(
@@ -1177,6 +1309,7 @@ def _verify_python_import(package_name: str, python_bin: Optional[str] = None) -
         [target_python, '-c', f'import {package_name}'],
         IMPORT_PROBE_TIMEOUT_SECONDS,
         f'import {package_name}',
+        capture_stdout=False,
     )
     if verify is None:
         logger.error(f"Import check for '{package_name}' não concluiu (timeout/erro)")
@@ -1196,6 +1329,7 @@ def _can_import(package_name: str, python_bin: Optional[str] = None) -> bool:
         [target_python, '-c', f'import {package_name}'],
         IMPORT_PROBE_TIMEOUT_SECONDS,
         f'import {package_name}',
+        capture_stdout=False,
     )
     return probe is not None and probe.returncode == 0
 
@@ -1429,10 +1563,72 @@ class _ConditionProbes:
         self._cache.clear()
 
 
-def install_pip_commands(pip_commands: List[Any]) -> bool:
-    """Install preset-defined pip dependencies."""
+def _plain_pip_install_specs(item: Any) -> Optional[List[str]]:
+    """Requirement specs of an unconditional, flagless `pip install`, else None."""
+    if isinstance(item, dict):
+        if set(item) - {'command', 'cmd', 'description'}:
+            return None
+        command = item.get('command') or item.get('cmd')
+    else:
+        command = item
+    try:
+        cmd = _normalize_pip_command(command)
+    except Exception:
+        return None
+    specs = cmd[4:]
+    if cmd[3:4] != ['install'] or not specs or any(spec.startswith('-') for spec in specs):
+        return None
+    return specs
+
+
+def _batch_pip_installs(pip_commands: List[Any]) -> List[Any]:
+    """Merge runs of consecutive plain installs into a single pip call.
+
+    Every pip start re-imports pip and re-reads the environment, and one
+    resolver pass over all requirements beats several. The merged entry keeps
+    its originals under '_batched' so a failure can be retried one by one.
+    """
+    batched: List[Any] = []
+    run: List[Tuple[Dict[str, Any], List[str]]] = []
+
+    def flush():
+        if len(run) == 1:
+            batched.append(run[0][0])
+        elif run:
+            batched.append({
+                'command': ['pip', 'install', *(spec for _, specs in run for spec in specs)],
+                'description': f"pip install agrupado ({len(run)} comandos)",
+                '_batched': [entry for entry, _ in run],
+            })
+        run.clear()
+
+    for index, item in enumerate(pip_commands, start=1):
+        # Pin the positional description now; merging shifts the positions.
+        if isinstance(item, str):
+            item = {'command': item, 'description': f"pip command #{index}"}
+        elif isinstance(item, dict) and 'description' not in item:
+            item = {**item, 'description': f"pip command #{index}"}
+        specs = _plain_pip_install_specs(item)
+        if specs is None:
+            flush()
+            batched.append(item)
+        else:
+            run.append((item, specs))
+    flush()
+    return batched
+
+
+def install_pip_commands(pip_commands: List[Any], batch: bool = True) -> bool:
+    """Install preset-defined pip dependencies.
+
+    With `batch`, consecutive plain installs share one pip run; if that run
+    fails they are retried individually so allow_failure and the error report
+    stay per command.
+    """
     if not pip_commands:
         return True
+    if batch:
+        pip_commands = _batch_pip_installs(pip_commands)
 
     probes = _ConditionProbes()
 
@@ -1446,6 +1642,7 @@ def install_pip_commands(pip_commands: List[Any]) -> bool:
             allow_failure = False
             verify_import = None
             description = f"pip command #{index}"
+            batched = None
         elif isinstance(item, dict):
             command = item.get('command') or item.get('cmd')
             condition = item.get('condition')
@@ -1454,6 +1651,7 @@ def install_pip_commands(pip_commands: List[Any]) -> bool:
             allow_failure = bool(item.get('allow_failure', False))
             verify_import = item.get('verify_import')
             description = item.get('description', f"pip command #{index}")
+            batched = item.get('_batched')
         else:
             logger.error(f"Invalid pip command format at position {index}: {type(item)}")
             return False
@@ -1490,6 +1688,12 @@ def install_pip_commands(pip_commands: List[Any]) -> bool:
         # probes), so cached probe results are no longer trustworthy.
         probes.invalidate()
 
+        if result_code != 0 and batched and not _install_cancel_event.is_set():
+            logger.warning(f"Failed {description} (exit {result_code}); repetindo um por vez")
+            if not install_pip_commands(batched, batch=False):
+                return False
+            continue
+
         if result_code != 0:
             logger_msg = logger.warning if allow_failure else logger.error
             logger_msg(f"Failed {description} (exit {result_code})")
@@ -1625,6 +1829,18 @@ def _install_presets_impl(preset_names: List[str], include_base: bool = True) ->
     use_sage_attention = False
     processed_presets = []
     known_models: List[Dict[str, Any]] = []
+    # Entry names per model directory, listed once: presets share a handful of
+    # directories, so one scandir each replaces two stats per model.
+    dir_entries: Dict[Path, frozenset] = {}
+
+    def entries_of(directory: Path) -> frozenset:
+        if directory not in dir_entries:
+            try:
+                with os.scandir(directory) as it:
+                    dir_entries[directory] = frozenset(entry.name for entry in it)
+            except OSError:
+                dir_entries[directory] = frozenset()
+        return dir_entries[directory]
 
     for preset_name in preset_names:
         if _install_cancel_event.is_set():
@@ -1651,8 +1867,8 @@ def _install_presets_impl(preset_names: List[str], include_base: bool = True) ->
 
                 known_models.append(model)
                 dest_path = MODELS_DIR / model_dir / filename
-                legacy_partial = dest_path.with_name(f"{dest_path.name}.aria2")
-                if dest_path.exists() and not legacy_partial.exists():
+                names = entries_of(dest_path.parent)
+                if dest_path.name in names and f"{dest_path.name}.aria2" not in names:
                     logger.info(f"✓ Already exists: {filename}")
                 else:
                     downloads.append(model)
@@ -1666,7 +1882,9 @@ def _install_presets_impl(preset_names: List[str], include_base: bool = True) ->
             use_sage_attention = True
             logger.info(f"Preset '{preset_name}' enables SageAttention runtime stack")
 
-        # Collect preset-specific pip commands
+        # Collect preset-specific pip commands. They run even for presets the
+        # state records as installed: the preset file or the venv may have
+        # changed since, and pip returns quickly for specs already satisfied.
         if 'pip_commands' in preset:
             pip_commands.extend(preset['pip_commands'])
 
@@ -1696,7 +1914,8 @@ def _install_presets_impl(preset_names: List[str], include_base: bool = True) ->
         'models',
         f"{len(downloads)} modelo(s) e {len(nodes)} custom node(s)"
     )
-    with ThreadPoolExecutor(max_workers=4) as executor:
+    # Two tasks at most: the downloads and the custom nodes.
+    with ThreadPoolExecutor(max_workers=2) as executor:
         download_future = None
         nodes_future = None
 
@@ -1946,10 +2165,14 @@ def _persist_comfyui_flags(state, preset_map: Dict[str, Dict[str, Any]]) -> None
     installed. The SageAttention flag is derived from the runtime stack because
     that reflects what is really in the venv — installing the wheel is useless
     unless ComfyUI is launched with --use-sage-attention.
+
+    Merged pair-aware, as at launch: a plain token dedup kept the first `2` of
+    `--reserve-vram 2` and dropped the one after `--cache-lru`, leaving that
+    flag without its value.
     """
-    flags: List[str] = []
+    flag_lists: List[List[str]] = []
     if state.get_runtime_stack() == 'sageattention':
-        flags.append('--use-sage-attention')
+        flag_lists.append(['--use-sage-attention'])
 
     for preset_name in state.get_installed_presets():
         preset = preset_map.get(preset_name)
@@ -1958,9 +2181,9 @@ def _persist_comfyui_flags(state, preset_map: Dict[str, Dict[str, Any]]) -> None
         preset_flags = preset.get('comfyui_flags') or []
         if preset_flags:
             logger.info(f"Preset '{preset_name}' contributes flags: {preset_flags}")
-        flags.extend(str(flag) for flag in preset_flags)
+        flag_lists.append([str(flag) for flag in preset_flags])
 
-    unique_flags = list(dict.fromkeys(flags))
+    unique_flags = merge_flags(*flag_lists)
     state.set_comfyui_flags(unique_flags)
     logger.info(f"Saved ComfyUI flags ({len(unique_flags)}): {' '.join(unique_flags) or 'nenhuma'}")
 
@@ -2239,14 +2462,12 @@ def _configure_manager_security():
 
 def _is_manager_pip_installed() -> bool:
     """Check if ComfyUI-Manager v4+ is installed as a pip package."""
-    try:
-        result = subprocess.run(
-            [_comfy_python(), '-c', 'import comfyui_manager; print("ok")'],
-            capture_output=True, text=True, timeout=15
-        )
-        return result.returncode == 0 and result.stdout.strip() == 'ok'
-    except Exception:
-        return False
+    result = _run_probe(
+        [_comfy_python(), '-c', 'import comfyui_manager; print("ok")'],
+        15,
+        'import comfyui_manager',
+    )
+    return result is not None and result.returncode == 0 and result.stdout.strip() == 'ok'
 
 
 def _run_capture_cancellable(
@@ -2431,11 +2652,70 @@ def _clone_node(
     return (url, node_name, dest, False, None)
 
 
+# Prints the requirements files (argv) that the interpreter does not already
+# satisfy. Anything it cannot judge — options, URLs, unparsable lines — counts
+# as unsatisfied, so the caller falls back to installing that file.
+_UNRESOLVED_REQUIREMENTS_PROBE = """
+import json, sys
+from importlib import metadata
+try:
+    from packaging.requirements import Requirement
+except ImportError:
+    from pip._vendor.packaging.requirements import Requirement
+
+def satisfied(path):
+    with open(path, encoding='utf-8', errors='replace') as handle:
+        for raw in handle:
+            line = raw.split(' #', 1)[0].strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                req = Requirement(line)
+            except Exception:
+                return False
+            if req.marker is not None and not req.marker.evaluate():
+                continue
+            if req.url:
+                return False
+            try:
+                version = metadata.version(req.name)
+            except metadata.PackageNotFoundError:
+                return False
+            if not req.specifier.contains(version, prereleases=True):
+                return False
+    return True
+
+print(json.dumps([path for path in sys.argv[1:] if not satisfied(path)]))
+"""
+
+
+def _unresolved_requirement_files(req_files: List[Path]) -> Optional[set]:
+    """Paths (as str) of requirements files the ComfyUI venv does not satisfy.
+
+    One interpreter start checks every file against the installed metadata,
+    so a failed combined install retries only the nodes that need it. None
+    when the probe cannot run; the caller then retries every node.
+    """
+    probe = _run_probe(
+        [_comfy_python(), '-c', _UNRESOLVED_REQUIREMENTS_PROBE, *map(str, req_files)],
+        IMPORT_PROBE_TIMEOUT_SECONDS,
+        'requirements satisfeitos',
+    )
+    if probe is None or probe.returncode != 0:
+        return None
+    try:
+        return set(_json_loads(probe.stdout))
+    except ValueError:
+        return None
+
+
 def install_custom_nodes(node_urls: List[str]) -> Dict[str, Any]:
     """Clone/update custom nodes with resilience - continues on failure.
 
     Clones run in parallel (IO/network-bound, safe). Requirements install
-    stays sequential because pip can corrupt an env under concurrent writes.
+    stays sequential because pip can corrupt an env under concurrent writes:
+    once every clone is in, all requirements.txt files go to a single resolver
+    run, and only if that fails is each node installed on its own.
 
     Returns dict with 'success' (bool), 'failed' (list of failed node names).
     """
@@ -2452,6 +2732,21 @@ def install_custom_nodes(node_urls: List[str]) -> Dict[str, Any]:
         _configure_manager_security()
 
     with _git_credential_env() as git_env:
+        # Checkouts recorded as installed are verified with two git probes
+        # each; run those concurrently instead of one node after another.
+        recorded = [url for url in node_urls if state.is_node_installed(url)]
+        verified: Dict[str, bool] = {}
+        if recorded:
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(NODES_CLONE_WORKERS, len(recorded)))
+            ) as ex:
+                verified = dict(zip(recorded, ex.map(
+                    lambda url: _git_checkout_matches_source(
+                        cn_dir / url.rstrip('/').split('/')[-1], url, env=git_env
+                    ),
+                    recorded,
+                )))
+
         # Partition into: manager-via-pip, already-installed, and needs-clone.
         to_clone: List[str] = []
         for url in node_urls:
@@ -2462,12 +2757,7 @@ def install_custom_nodes(node_urls: List[str]) -> Dict[str, Any]:
                 logger.info("✓ ComfyUI-Manager v4+ detected as pip package (skipping git clone)")
                 state.add_node(url)
                 continue
-            node_dest = cn_dir / node_name
-            if state.is_node_installed(url) and _git_checkout_matches_source(
-                node_dest,
-                url,
-                env=git_env,
-            ):
+            if verified.get(url):
                 logger.info(f"✓ Fully installed node: {node_name} (skipping)")
                 continue
             to_clone.append(url)
@@ -2478,16 +2768,12 @@ def install_custom_nodes(node_urls: List[str]) -> Dict[str, Any]:
         workers = max(1, min(NODES_CLONE_WORKERS, len(to_clone)))
         logger.info(
             f"Cloning {len(to_clone)} custom nodes (parallel workers={workers}); "
-            "requirements install as clones complete"
+            "requirements install after the clones"
         )
         _set_progress_stage('nodes', f"clonando {len(to_clone)} custom node(s)")
 
-        # Pipeline: submit clones to a pool and consume completions as they arrive
-        # in the main thread so `pip install -r requirements.txt` can start for a
-        # finished node while other nodes are still cloning. Pip itself stays
-        # sequential (single-threaded here) because concurrent writes into the
-        # same venv can corrupt dist-info.
-        done_nodes = 0
+        # (url, node_name, requirements.txt) of cloned nodes still to install.
+        pending_requirements: List[Tuple[str, str, Path]] = []
         with ThreadPoolExecutor(max_workers=workers) as ex:
             futures = [ex.submit(_clone_node, url, cn_dir, git_env) for url in to_clone]
             for fut in as_completed(futures):
@@ -2511,7 +2797,6 @@ def install_custom_nodes(node_urls: List[str]) -> Dict[str, Any]:
                         "resuming requirements installation"
                     )
 
-                done_nodes += 1
                 if not clone_ok:
                     logger.error(f"Failed to clone node {node_name} after retries: {url}")
                     failed_nodes.append(node_name)
@@ -2519,28 +2804,79 @@ def install_custom_nodes(node_urls: List[str]) -> Dict[str, Any]:
 
                 req_file = dest / 'requirements.txt'
                 if req_file.exists():
-                    logger.info(f"Installing requirements for {node_name}...")
-                    _set_progress_stage(
-                        'nodes',
-                        f"[{done_nodes}/{len(to_clone)}] requirements de {node_name}"
-                    )
-                    retcode, last_line = _run_pip_install_streaming(
-                        _pip_install_argv(['-r', str(req_file)]),
-                        node_name,
-                        progress_stage='nodes',
-                    )
-                    if retcode != 0:
-                        if _install_cancel_event.is_set():
-                            return {"success": False, "failed": failed_nodes, "cancelled": True}
-                        logger.warning(
-                            f"Requirements install failed for {node_name} (exit {retcode}), continuing"
-                        )
-                        if last_line:
-                            logger.warning(f"[{node_name} pip last] {last_line}")
-                        failed_nodes.append(node_name)
-                        continue
+                    pending_requirements.append((url, node_name, req_file))
+                else:
+                    state.add_node(url)
+
+        # One resolver pass over the union is far cheaper than a pip start and
+        # a full resolve per node, and shared dependencies are fetched once.
+        if len(pending_requirements) > 1:
+            names = [node_name for _, node_name, _ in pending_requirements]
+            logger.info(f"Installing requirements for {len(names)} nodes: {', '.join(names)}")
+            _set_progress_stage('nodes', f"requirements de {len(names)} custom node(s)")
+            args: List[str] = []
+            for _, _, req_file in pending_requirements:
+                args += ['-r', str(req_file)]
+            retcode, last_line = _run_pip_install_streaming(
+                _pip_install_argv(args),
+                'custom nodes',
+                timeout_sec=max(
+                    NODE_PIP_TIMEOUT_SECONDS,
+                    min(NODE_PIP_TIMEOUT_SECONDS * len(names), NODE_PIP_COMBINED_TIMEOUT_SECONDS),
+                ),
+                progress_stage='nodes',
+            )
+            if retcode == 0:
+                for url, _, _ in pending_requirements:
+                    state.add_node(url)
+                pending_requirements = []
+            elif _install_cancel_event.is_set():
+                return {"success": False, "failed": failed_nodes, "cancelled": True}
+            else:
+                # Some node's pins conflict with another's (or one file is
+                # broken): install one by one to find and isolate it. Nodes
+                # whose requirements are already satisfied need no second pass.
+                logger.warning(
+                    f"Combined requirements install failed (exit {retcode}); "
+                    "retrying node by node"
+                )
+                if last_line:
+                    logger.warning(f"[custom nodes pip last] {last_line}")
+                unresolved = _unresolved_requirement_files(
+                    [req_file for _, _, req_file in pending_requirements]
+                )
+                if unresolved is not None:
+                    for url, node_name, req_file in pending_requirements:
+                        if str(req_file) not in unresolved:
+                            logger.info(f"✓ Requirements já satisfeitos: {node_name}")
+                            state.add_node(url)
+                    pending_requirements = [
+                        item for item in pending_requirements if str(item[2]) in unresolved
+                    ]
+
+        for position, (url, node_name, req_file) in enumerate(pending_requirements, start=1):
+            logger.info(f"Installing requirements for {node_name}...")
+            _set_progress_stage(
+                'nodes',
+                f"[{position}/{len(pending_requirements)}] requirements de {node_name}"
+            )
+            retcode, last_line = _run_pip_install_streaming(
+                _pip_install_argv(['-r', str(req_file)]),
+                node_name,
+                progress_stage='nodes',
+            )
+            if retcode != 0:
+                if _install_cancel_event.is_set():
+                    return {"success": False, "failed": failed_nodes, "cancelled": True}
+                logger.warning(
+                    f"Requirements install failed for {node_name} (exit {retcode}), continuing"
+                )
+                if last_line:
+                    logger.warning(f"[{node_name} pip last] {last_line}")
+                failed_nodes.append(node_name)
+                continue
 
-                state.add_node(url)
+            state.add_node(url)
 
     if failed_nodes:
         logger.warning(f"Nodes that failed to install: {', '.join(failed_nodes)}")
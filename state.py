@@ -27,6 +27,9 @@ class StateManager:
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
         self._lock = threading.RLock()
         self.state = self._load_state()
+        # Frozen view of installed_presets for read-heavy callers (the web UI
+        # rebuilds its preset list from it); dropped whenever the list changes.
+        self._installed_presets_set: Optional[frozenset] = None
 
     def _load_state(self) -> Dict:
         """Load state from disk.
@@ -134,6 +137,7 @@ class StateManager:
         with self._lock:
             if preset_name not in self.state["installed_presets"]:
                 self.state["installed_presets"].append(preset_name)
+                self._installed_presets_set = None
                 self.state["last_install"] = datetime.now().isoformat()
                 self._save_state()
                 logger.info(f"Marked preset as installed: {preset_name}")
@@ -148,11 +152,19 @@ class StateManager:
         with self._lock:
             return list(self.state["installed_presets"])
 
+    def get_installed_presets_set(self) -> frozenset:
+        """Installed preset names as a cached frozenset (no copy per call)."""
+        with self._lock:
+            if self._installed_presets_set is None:
+                self._installed_presets_set = frozenset(self.state["installed_presets"])
+            return self._installed_presets_set
+
     def remove_preset(self, preset_name: str) -> bool:
         """Remove preset from installed list. Returns True if it was present."""
         with self._lock:
             if preset_name in self.state["installed_presets"]:
                 self.state["installed_presets"].remove(preset_name)
+                self._installed_presets_set = None
                 self._save_state()
                 logger.info(f"Removed preset from state: {preset_name}")
                 return True
@@ -308,6 +320,7 @@ class StateManager:
         """Reset state to defaults"""
         with self._lock:
             self.state = self._default_state()
+            self._installed_presets_set = None
             self._save_state()
             logger.info("State reset to defaults")
 
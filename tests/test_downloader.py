@@ -2,7 +2,7 @@ import tempfile
 import threading
 import unittest
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from downloader import DownloadManager
 
@@ -15,6 +15,16 @@ class _ProcessSequence:
         return next(self._states)
 
 
+class _ChunkedStream:
+    """Raw pipe stand-in: each read() returns the next chunk, then EOF."""
+
+    def __init__(self, chunks):
+        self._chunks = list(chunks)
+
+    def read(self, _size=-1):
+        return self._chunks.pop(0) if self._chunks else b''
+
+
 class DownloadStagingTests(unittest.TestCase):
     def _manager(self, models_dir: Path) -> DownloadManager:
         """Build a manager without __init__ (no network/tool probing).
@@ -44,6 +54,8 @@ class DownloadStagingTests(unittest.TestCase):
         # An importable huggingface_hub is what enables the HF backends.
         manager.has_hf_hub = True
         manager.has_hf_xet = True
+        manager._hf_sizes_cache = {}
+        manager._hf_sizes_lock = threading.Lock()
         return manager
 
     def test_hf_work_dirs_are_isolated_and_stable(self):
@@ -470,6 +482,46 @@ class DownloadStagingTests(unittest.TestCase):
 
         cleanup.assert_called_once_with()
 
+    def test_hf_sizes_share_one_repo_listing(self):
+        manager = self._manager(Path('/tmp/models'))
+        listing = Mock(status_code=200)
+        listing.json.return_value = {'siblings': [
+            {'rfilename': 'a.safetensors', 'size': 135, 'lfs': {'size': 4096}},
+            {'rfilename': 'b/c.safetensors', 'size': 2048},
+        ]}
+
+        with patch('downloader._api_session') as session:
+            session.return_value.get.return_value = listing
+            first = manager._hf_remote_size('org/repo', 'main', 'a.safetensors')
+            second = manager._hf_remote_size('org/repo', 'main', 'b/c.safetensors')
+
+        self.assertEqual((first, second), (4096, 2048))
+        session.return_value.get.assert_called_once()
+        session.return_value.head.assert_not_called()
+
+    def test_hf_size_falls_back_to_head_when_listing_fails(self):
+        manager = self._manager(Path('/tmp/models'))
+        head_resp = Mock(status_code=200, headers={'x-linked-size': '777'})
+
+        with patch('downloader._api_session') as session:
+            session.return_value.get.return_value = Mock(status_code=401)
+            session.return_value.head.return_value = head_resp
+            size = manager._hf_remote_size('org/gated', 'main', 'model.safetensors')
+
+        self.assertEqual(size, 777)
+
+    def test_cr_aware_reader_splits_chunks_and_keeps_partial_utf8(self):
+        manager = self._manager(Path('/tmp/models'))
+        accent = 'ã'.encode('utf-8')
+        stream = _ChunkedStream([
+            b' 10%\r 20', b'%\r\nbaix' + accent[:1],
+            accent[1:] + b'ndo\n', b'tail',
+        ])
+
+        lines = list(manager._read_lines_cr_aware(stream))
+
+        self.assertEqual(lines, [' 10%', ' 20%', 'baixãndo', 'tail'])
+
     def test_deterministic_404_is_not_retried(self):
         manager = self._manager(Path('/tmp/models'))
 
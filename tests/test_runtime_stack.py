@@ -1,4 +1,5 @@
 import os
+import socket
 import subprocess
 import sys
 import tempfile
@@ -8,6 +9,7 @@ import unittest
 from pathlib import Path
 from unittest.mock import Mock, call, patch
 
+import process_manager
 import start
 import server
 from state import StateManager
@@ -274,6 +276,44 @@ class PipInstallStreamingTests(unittest.TestCase):
         self.assertEqual(start.get_install_status()['install_status'], 'cancelled')
 
 
+class PipCommandBatchTests(unittest.TestCase):
+    def setUp(self):
+        start._install_cancel_event.clear()
+        patcher = patch('start._comfy_python', return_value='/venv/bin/python')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch('start._run_streaming_command', return_value=(0, []))
+    def test_consecutive_plain_installs_share_one_pip_run(self, run_command):
+        ok = start.install_pip_commands([
+            'pip install einops',
+            {'command': 'pip install ftfy==6.2', 'description': 'ftfy'},
+            {'command': 'pip install xformers', 'allow_failure': True},
+            'pip install --no-deps sageattention',
+            'pip install onnx',
+        ])
+
+        self.assertTrue(ok)
+        commands = [c.args[0] for c in run_command.call_args_list]
+        self.assertEqual(commands[0], [
+            '/venv/bin/python', '-m', 'pip', 'install', 'einops', 'ftfy==6.2',
+        ])
+        self.assertEqual([command[4:] for command in commands[1:]], [
+            ['xformers'], ['--no-deps', 'sageattention'], ['onnx'],
+        ])
+
+    @patch('start._run_streaming_command')
+    def test_failed_batch_is_retried_one_command_at_a_time(self, run_command):
+        run_command.side_effect = [(1, ['conflict']), (0, []), (1, ['no wheel'])]
+
+        ok = start.install_pip_commands(['pip install einops', 'pip install broken'])
+
+        self.assertFalse(ok)
+        commands = [c.args[0][4:] for c in run_command.call_args_list]
+        self.assertEqual(commands, [['einops', 'broken'], ['einops'], ['broken']])
+        self.assertEqual(run_command.call_args.args[1], 'pip command #2')
+
+
 class InstallCoordinatorTests(unittest.TestCase):
     def tearDown(self):
         start._install_cancel_event.clear()
@@ -699,6 +739,233 @@ class CustomNodeRecoveryTests(unittest.TestCase):
         self.assertEqual(result['failed'], ['broken-node'])
         state.add_node.assert_not_called()
 
+    @patch('start._pip_install_argv', side_effect=lambda args: ['pip', 'install', *args])
+    @patch('start.get_state_manager')
+    def test_requirements_share_one_pip_run_and_fall_back_per_node(
+        self,
+        get_state_manager,
+        _pip_argv,
+    ):
+        state = get_state_manager.return_value
+        state.is_node_installed.return_value = False
+        urls = {
+            name: f'https://github.com/example/{name}'
+            for name in ('good-node', 'other-node', 'broken-node')
+        }
+
+        def run_pip(cmd, node_name, **kwargs):
+            return (1, 'conflict') if any('broken-node' in arg for arg in cmd) else (0, '')
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            comfy_dir = Path(temp_dir)
+            self._make_cloned_nodes(comfy_dir, urls)
+
+            with patch.object(start, 'COMFY_DIR', comfy_dir), \
+                    patch('start._run_pip_install_streaming', side_effect=run_pip) as pip:
+                result = start.install_custom_nodes(list(urls.values()))
+
+        merged = pip.call_args_list[0].args[0]
+        self.assertEqual(merged.count('-r'), 3)
+        self.assertEqual(pip.call_count, 4)
+        self.assertEqual(result['failed'], ['broken-node'])
+        self.assertEqual(
+            {c.args[0] for c in state.add_node.call_args_list},
+            {urls['good-node'], urls['other-node']},
+        )
+
+
+    @patch('start._pip_install_argv', side_effect=lambda args: ['pip', 'install', *args])
+    @patch('start.get_state_manager')
+    def test_failed_combined_run_retries_only_unresolved_nodes(
+        self,
+        get_state_manager,
+        _pip_argv,
+    ):
+        state = get_state_manager.return_value
+        state.is_node_installed.return_value = False
+        urls = {
+            name: f'https://github.com/example/{name}'
+            for name in ('good-node', 'other-node', 'broken-node')
+        }
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            comfy_dir = Path(temp_dir)
+            self._make_cloned_nodes(comfy_dir, urls)
+            broken = str(comfy_dir / 'custom_nodes' / 'broken-node' / 'requirements.txt')
+
+            with patch.object(start, 'COMFY_DIR', comfy_dir), \
+                    patch.object(start, 'NODE_PIP_TIMEOUT_SECONDS', 1800), \
+                    patch.object(start, 'NODE_PIP_COMBINED_TIMEOUT_SECONDS', 2400), \
+                    patch('start._unresolved_requirement_files', return_value={broken}), \
+                    patch('start._run_pip_install_streaming', return_value=(1, 'conflict')) as pip:
+                result = start.install_custom_nodes(list(urls.values()))
+
+        self.assertEqual(pip.call_count, 2)
+        self.assertEqual(pip.call_args_list[0].kwargs['timeout_sec'], 2400)
+        self.assertIn(broken, pip.call_args_list[1].args[0])
+        self.assertEqual(result['failed'], ['broken-node'])
+        self.assertEqual(
+            {c.args[0] for c in state.add_node.call_args_list},
+            {urls['good-node'], urls['other-node']},
+        )
+
+    @staticmethod
+    def _make_cloned_nodes(comfy_dir, urls):
+        for name, url in urls.items():
+            node_dir = comfy_dir / 'custom_nodes' / name
+            node_dir.mkdir(parents=True)
+            (node_dir / 'requirements.txt').write_text(f'{name}-package\n')
+            subprocess.run(['git', 'init', '-q'], cwd=node_dir, check=True)
+            subprocess.run(['git', 'add', 'requirements.txt'], cwd=node_dir, check=True)
+            subprocess.run(
+                ['git', '-c', 'user.email=t@t', '-c', 'user.name=t',
+                 'commit', '-qm', 'init'],
+                cwd=node_dir,
+                check=True,
+            )
+            subprocess.run(['git', 'remote', 'add', 'origin', url], cwd=node_dir, check=True)
+
+
+class InstalledPresetSetTests(unittest.TestCase):
+    def test_cached_set_follows_add_remove_and_reset(self):
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch('state.STATE_FILE', Path(temp_dir) / 'state.json'):
+            state = StateManager()
+            state.add_preset('Flux')
+            first = state.get_installed_presets_set()
+            self.assertIs(first, state.get_installed_presets_set())
+            state.add_preset('Wan')
+            self.assertEqual(state.get_installed_presets_set(), {'Flux', 'Wan'})
+            state.remove_preset('Flux')
+            self.assertEqual(state.get_installed_presets_set(), {'Wan'})
+            state.reset_state()
+            self.assertEqual(state.get_installed_presets_set(), frozenset())
+
+
+class FlagMergeTests(unittest.TestCase):
+    def test_later_pairs_and_switches_replace_earlier_ones(self):
+        merged = process_manager.merge_flags(
+            ['--listen', '0.0.0.0', '--port', '8818', '--fast'],
+            ['--port', '9000', '--reserve-vram', '2'],
+            ['--fast', '--cache-lru', '2'],
+        )
+
+        self.assertEqual(merged, [
+            '--listen', '0.0.0.0',
+            '--port', '9000',
+            '--reserve-vram', '2',
+            '--fast',
+            '--cache-lru', '2',
+        ])
+
+    def test_missing_lists_are_skipped(self):
+        self.assertEqual(process_manager.merge_flags(['--cpu'], None, []), ['--cpu'])
+
+    def test_persisted_flags_keep_values_shared_by_two_presets(self):
+        state = Mock()
+        state.get_runtime_stack.return_value = 'sageattention'
+        state.get_installed_presets.return_value = ['A', 'B']
+        preset_map = {
+            'A': {'comfyui_flags': ['--reserve-vram', '2', '--fast']},
+            'B': {'comfyui_flags': ['--cache-lru', '2', '--fast']},
+        }
+
+        start._persist_comfyui_flags(state, preset_map)
+
+        state.set_comfyui_flags.assert_called_once_with([
+            '--use-sage-attention', '--reserve-vram', '2', '--cache-lru', '2', '--fast',
+        ])
+
+
+class CudaProbeTests(unittest.TestCase):
+    @patch('start._run_probe')
+    def test_host_without_nvidia_driver_skips_the_torch_import(self, run_probe):
+        with patch.object(start, 'NVIDIA_DRIVER_PATHS', ('/nonexistent/nvidia',)):
+            self.assertFalse(start._cuda_available())
+        run_probe.assert_not_called()
+
+    @patch('start._run_probe')
+    def test_host_with_nvidia_driver_asks_torch(self, run_probe):
+        run_probe.return_value = subprocess.CompletedProcess([], 0, stdout='1\n', stderr='')
+        with patch.object(start, 'NVIDIA_DRIVER_PATHS', (sys.executable,)):
+            self.assertTrue(start._cuda_available())
+        run_probe.assert_called_once()
+
+    @patch('start._run_probe')
+    def test_driver_cuda_version_is_probed_once(self, run_probe):
+        header = '| NVIDIA-SMI 570.86  Driver Version: 570.86  CUDA Version: 12.8 |'
+        run_probe.return_value = subprocess.CompletedProcess([], 0, stdout=header, stderr='')
+        start._driver_max_cuda.cache_clear()
+        self.addCleanup(start._driver_max_cuda.cache_clear)
+        with patch('start.shutil.which', return_value='/usr/bin/nvidia-smi'):
+            versions = [start._driver_max_cuda() for _ in range(3)]
+        self.assertEqual(versions, ['12.8'] * 3)
+        run_probe.assert_called_once()
+
+
+    def test_comfy_python_created_later_replaces_the_fallback(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            comfy_python = Path(temp_dir) / 'venv' / 'python'
+            template_python = Path(temp_dir) / 'template-python'
+            template_python.touch()
+            with patch.object(start, 'COMFY_PYTHON', comfy_python), \
+                    patch.object(start, 'TEMPLATE_PYTHONS', (template_python,)), \
+                    patch.object(start, '_resolved_comfy_python', None):
+                before = start._resolve_comfy_python()
+                comfy_python.parent.mkdir()
+                comfy_python.touch()
+                after = start._resolve_comfy_python()
+        self.assertEqual(before, str(template_python))
+        self.assertEqual(after, str(comfy_python))
+
+
+class ProcessManagerProbeTests(unittest.TestCase):
+    def test_connect_probe_tracks_listener_lifetime(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen()
+        port = listener.getsockname()[1]
+        try:
+            self.assertTrue(process_manager._port_accepts_connections(port))
+        finally:
+            listener.close()
+
+        self.assertFalse(process_manager._port_accepts_connections(port))
+
+    def test_listener_off_loopback_is_found_by_the_socket_scan(self):
+        listener = Mock(status=process_manager.psutil.CONN_LISTEN, laddr=Mock(port=8818))
+        with patch('process_manager._port_accepts_connections', return_value=False), \
+                patch('process_manager.psutil.net_connections', return_value=[listener]):
+            self.assertTrue(process_manager._port_has_listener(8818))
+            self.assertFalse(process_manager._port_has_listener(8819))
+
+    @unittest.skipUnless(hasattr(os, 'pidfd_open'), 'pidfd_open not available')
+    def test_exit_wait_returns_when_all_pids_exit_or_times_out(self):
+        quick = [subprocess.Popen([sys.executable, '-c', 'pass']) for _ in range(2)]
+        slow = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+        try:
+            self.assertTrue(process_manager._wait_for_exit([p.pid for p in quick], timeout=10))
+            started = time.monotonic()
+            self.assertFalse(process_manager._wait_for_exit([slow.pid], timeout=0.2))
+            self.assertLess(time.monotonic() - started, 5)
+        finally:
+            slow.kill()
+            for proc in quick + [slow]:
+                proc.wait()
+
+    def test_pid_liveness_treats_unreaped_child_as_dead(self):
+        manager = process_manager.ProcessManager.__new__(process_manager.ProcessManager)
+        child = subprocess.Popen([sys.executable, '-c', 'pass'])
+        try:
+            deadline = time.monotonic() + 5
+            # Exited but not yet reaped: a zombie must not count as running.
+            while manager._pid_is_alive(child.pid) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            self.assertFalse(manager._pid_is_alive(child.pid))
+        finally:
+            child.wait()
+        self.assertTrue(manager._pid_is_alive(os.getpid()))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -763,6 +1030,19 @@ class StreamCommandLivenessTests(unittest.TestCase):
         )
         self.assertEqual(rc, 0, "stall_sec defaults to off for existing callers")
 
+    def test_collected_output_is_bounded_to_the_tail(self):
+        with patch.object(start, 'STREAM_OUTPUT_TAIL_LINES', 5):
+            rc, lines, last_line = start._stream_command(
+                self._child("for i in range(50):\n    print(i)\n"),
+                'chatty child',
+                log_prefix='chatty',
+                timeout_sec=0,
+                heartbeat_interval=0.3,
+            )
+        self.assertEqual(rc, 0)
+        self.assertEqual(lines, ['45', '46', '47', '48', '49'])
+        self.assertEqual(last_line, '49')
+
 
 class InstallOutcomeTests(unittest.TestCase):
     """A usable install must launch ComfyUI even when some artifacts are missing."""
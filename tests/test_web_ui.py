@@ -1,8 +1,10 @@
 import contextlib
+import gzip
 import http.client
 import json
 import tempfile
 import threading
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import Mock, patch
@@ -65,6 +67,43 @@ class PresetModificationTests(unittest.TestCase):
             [200.0, 100.0, 100.0],
         )
 
+    def test_load_presets_reuses_parsed_list_until_a_file_changes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            preset_file = Path(directory) / "cached.json"
+            preset_file.write_text(json.dumps({"name": "Cached"}), encoding="utf-8")
+
+            with patch.object(start, "PRESETS_DIR", Path(directory)), patch(
+                "start.preset_modified_timestamps", return_value={}
+            ) as timestamps:
+                first = start.load_presets()
+                second = start.load_presets()
+                preset_file.write_text(json.dumps({"name": "Renamed!"}), encoding="utf-8")
+                third = start.load_presets()
+
+        self.assertIs(second, first)
+        self.assertEqual(second[0]["name"], "Cached")
+        self.assertEqual(third[0]["name"], "Renamed!")
+        self.assertEqual(timestamps.call_count, 2)
+
+    def test_load_presets_only_reparses_the_changed_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            kept = Path(directory) / "kept.json"
+            edited = Path(directory) / "edited.json"
+            kept.write_text(json.dumps({"name": "Kept", "models": [{"url": "u"}]}), encoding="utf-8")
+            edited.write_text(json.dumps({"name": "Edited"}), encoding="utf-8")
+
+            with patch.object(start, "PRESETS_DIR", Path(directory)), \
+                    patch("start.preset_modified_timestamps", return_value={}), \
+                    patch("start._json_loads", side_effect=json.loads) as decode:
+                first = {preset["_filename"]: preset for preset in start.load_presets()}
+                edited.write_text(json.dumps({"name": "Edited again"}), encoding="utf-8")
+                second = start.load_presets()
+
+        self.assertEqual(decode.call_count, 3)
+        names = {preset["_filename"]: preset for preset in second}
+        self.assertEqual(names["edited.json"]["name"], "Edited again")
+        self.assertIs(names["kept.json"]["models"], first["kept.json"]["models"])
+
     def test_untracked_preset_uses_filesystem_mtime(self):
         with tempfile.TemporaryDirectory() as directory:
             preset_dir = Path(directory)
@@ -202,6 +241,392 @@ class PresetSerializationTests(unittest.TestCase):
         self.assertEqual(result, [])
 
 
+class HttpTransportTests(unittest.TestCase):
+    def test_pool_serves_more_connections_than_workers(self):
+        httpd = server.PooledHTTPServer(("127.0.0.1", 0), server.PresetHandler, max_workers=2)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        connections = []
+        try:
+            statuses = []
+            # Connections stay open, as a browser's keep-alive sockets would.
+            for _ in range(5):
+                connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=5)
+                connections.append(connection)
+                connection.request("GET", "/api/presets")
+                response = connection.getresponse()
+                response.read()
+                statuses.append(response.status)
+            for connection in connections:
+                connection.request("GET", "/api/status")
+                response = connection.getresponse()
+                response.read()
+                statuses.append(response.status)
+        finally:
+            for connection in connections:
+                connection.close()
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join()
+
+        self.assertEqual(statuses, [200] * 10)
+        self.assertTrue(all(worker.daemon for worker in httpd._workers))
+
+    def test_idle_keep_alive_connections_do_not_hold_workers(self):
+        httpd = server.PooledHTTPServer(("127.0.0.1", 0), server.PresetHandler, max_workers=2)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        idle = []
+        try:
+            for _ in range(4):
+                connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=5)
+                connection.request("GET", "/api/presets")
+                connection.getresponse().read()
+                idle.append(connection)
+
+            fresh = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=5)
+            started = time.monotonic()
+            try:
+                fresh.request("GET", "/api/presets")
+                response = fresh.getresponse()
+                response.read()
+            finally:
+                fresh.close()
+            elapsed = time.monotonic() - started
+
+            # A parked connection is served again when its next request arrives.
+            idle[0].request("GET", "/api/presets")
+            reused = idle[0].getresponse()
+            reused.read()
+        finally:
+            for connection in idle:
+                connection.close()
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join()
+
+        self.assertEqual(response.status, 200)
+        self.assertLess(elapsed, 2)
+        self.assertEqual(reused.status, 200)
+
+    def test_connection_parked_after_close_is_shut_down(self):
+        httpd = server.PooledHTTPServer(("127.0.0.1", 0), server.PresetHandler, max_workers=1)
+        httpd.server_close()
+        handler = Mock()
+
+        httpd._park(handler)
+
+        self.assertFalse(handler.keep_alive)
+        handler.finish.assert_called_once_with()
+        handler.request.close.assert_called_once_with()
+
+    def test_preflight_and_errors_carry_cors_on_a_kept_alive_connection(self):
+        httpd = server.PooledHTTPServer(("127.0.0.1", 0), server.PresetHandler, max_workers=1)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=5)
+        try:
+            connection.request("OPTIONS", "/api/install")
+            preflight = connection.getresponse()
+            preflight.read()
+            connection.request("POST", "/api/unknown", body=b"")
+            missing = connection.getresponse()
+            missing.read()
+        finally:
+            connection.close()
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join()
+
+        self.assertEqual(preflight.status, 204)
+        self.assertEqual(preflight.getheader("Access-Control-Allow-Origin"), "*")
+        self.assertEqual(missing.status, 404)
+        self.assertEqual(missing.getheader("Access-Control-Allow-Origin"), "*")
+
+    def test_unread_post_body_does_not_corrupt_the_next_request(self):
+        httpd = server.PooledHTTPServer(("127.0.0.1", 0), server.PresetHandler, max_workers=1)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=5)
+        try:
+            with patch("start.cancel_active_install", return_value=False):
+                connection.request("POST", "/api/cancel", body=b"{}")
+                cancel = connection.getresponse()
+                cancel.read()
+            connection.request("POST", "/api/unknown", body=b'{"x": 1}')
+            missing = connection.getresponse()
+            missing.read()
+            connection.request("GET", "/api/presets")
+            presets = connection.getresponse()
+            presets.read()
+        finally:
+            connection.close()
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join()
+
+        self.assertEqual(cancel.status, 200)
+        self.assertEqual(missing.status, 404)
+        self.assertEqual(presets.status, 200)
+
+    def test_connection_is_reused_and_large_json_is_gzipped(self):
+        presets = [
+            {'name': f'Preset {i}', 'description': 'x' * 80, '_filename': f'p{i}.json'}
+            for i in range(30)
+        ]
+        httpd = server.PooledHTTPServer(("127.0.0.1", 0), server.PresetHandler, max_workers=2)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=5)
+        try:
+            with patch.object(server, "_presets_callback", lambda: presets):
+                connection.request("GET", "/api/presets", headers={"Accept-Encoding": "gzip"})
+                first = connection.getresponse()
+                compressed = first.read()
+                first_socket = connection.sock
+                connection.request("GET", "/api/presets")
+                second = connection.getresponse()
+                plain = second.read()
+                second_socket = connection.sock
+        finally:
+            connection.close()
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join()
+
+        self.assertIs(first_socket, second_socket)
+        self.assertEqual(first.getheader("Content-Encoding"), "gzip")
+        self.assertIsNone(second.getheader("Content-Encoding"))
+        self.assertEqual(gzip.decompress(compressed), plain)
+        self.assertEqual(len(json.loads(plain)["presets"]), 30)
+
+    def test_gzip_and_identity_bodies_carry_distinct_etags(self):
+        presets = [
+            {'name': f'Preset {i}', 'description': 'x' * 80, '_filename': f'p{i}.json'}
+            for i in range(30)
+        ]
+        httpd = server.PooledHTTPServer(("127.0.0.1", 0), server.PresetHandler, max_workers=1)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=5)
+        gzip_headers = {"Accept-Encoding": "gzip"}
+        try:
+            with patch.object(server, "_presets_callback", lambda: presets):
+                connection.request("GET", "/api/presets", headers=gzip_headers)
+                compressed = connection.getresponse()
+                compressed.read()
+                connection.request("GET", "/api/presets")
+                plain = connection.getresponse()
+                plain.read()
+                gzip_etag = compressed.getheader("ETag")
+                connection.request("GET", "/api/presets", headers={**gzip_headers, "If-None-Match": gzip_etag})
+                revalidated = connection.getresponse()
+                revalidated.read()
+                connection.request("GET", "/api/presets", headers={"If-None-Match": gzip_etag})
+                identity = connection.getresponse()
+                identity.read()
+        finally:
+            connection.close()
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join()
+
+        self.assertNotEqual(gzip_etag, plain.getheader("ETag"))
+        self.assertEqual(revalidated.status, 304)
+        self.assertEqual(revalidated.getheader("Vary"), "Accept-Encoding")
+        self.assertEqual(identity.status, 200)
+        self.assertIsNone(identity.getheader("Content-Encoding"))
+
+
+class PresetsEndpointCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.PresetHandler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def get_presets(self, headers=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.httpd.server_port, timeout=5)
+        try:
+            connection.request("GET", "/api/presets", headers=headers or {})
+            response = connection.getresponse()
+            return response.status, response.getheader("ETag"), response.read()
+        finally:
+            connection.close()
+
+    def test_unchanged_presets_reuse_body_and_honor_if_none_match(self):
+        callback = Mock(return_value=[{"name": "Cached", "_filename": "cached.json"}])
+        state = Mock()
+        state.get_installed_presets_set.return_value = frozenset()
+
+        with patch.object(server, "_presets_callback", callback), \
+                patch.object(server, "_state_manager", state):
+            status, etag, body = self.get_presets()
+            revalidated = self.get_presets({"If-None-Match": etag})
+            state.get_installed_presets_set.return_value = frozenset({"Cached"})
+            changed_status, changed_etag, changed_body = self.get_presets({"If-None-Match": etag})
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["presets"][0]["name"], "Cached")
+        self.assertEqual(revalidated, (304, etag, b""))
+        self.assertEqual(changed_status, 200)
+        self.assertNotEqual(changed_etag, etag)
+        self.assertTrue(json.loads(changed_body)["presets"][0]["installed"])
+        self.assertEqual(callback.call_count, 2)
+
+    def test_if_none_match_accepts_weak_and_listed_etags(self):
+        cases = {
+            '"abc"': True,
+            'W/"abc"': True,
+            '"old", W/"abc"': True,
+            '*': True,
+            '"abcd"': False,
+            '': False,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertIs(server._etag_matches(header, '"abc"'), expected)
+
+    def test_workflow_download_is_sent_whole_on_a_kept_alive_connection(self):
+        workflow = next((Path(server.__file__).parent / "workflows").glob("*.json"))
+        connection = http.client.HTTPConnection("127.0.0.1", self.httpd.server_port, timeout=5)
+        try:
+            connection.request("GET", f"/api/workflows/{workflow.name}")
+            response = connection.getresponse()
+            body = response.read()
+            connection.request("GET", f"/api/workflows/{workflow.name}")
+            again = connection.getresponse()
+            again_body = again.read()
+        finally:
+            connection.close()
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, workflow.read_bytes())
+        self.assertEqual(again_body, body)
+
+    def test_preloaded_static_assets_are_served_from_memory(self):
+        web_dir = Path(__file__).resolve().parent.parent / "web"
+        assets = server._load_static_assets(web_dir)
+        index_body = (web_dir / "index.html").read_bytes()
+
+        with patch.dict(server._static_assets, assets, clear=True):
+            connection = http.client.HTTPConnection("127.0.0.1", self.httpd.server_port, timeout=5)
+            try:
+                connection.request("GET", "/?v=1")
+                response = connection.getresponse()
+                body = response.read()
+                etag = response.getheader("ETag")
+                connection.request("GET", "/index.html", headers={"If-None-Match": etag})
+                revalidated = connection.getresponse()
+                revalidated.read()
+                connection.request("GET", "/app.js", headers={"Accept-Encoding": "gzip"})
+                script = connection.getresponse()
+                script_body = script.read()
+            finally:
+                connection.close()
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, index_body)
+        self.assertEqual(response.getheader("Content-Type"), "text/html")
+        self.assertEqual(revalidated.status, 304)
+        self.assertEqual(script.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(gzip.decompress(script_body), (web_dir / "app.js").read_bytes())
+
+    def test_edited_static_asset_is_reloaded(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            web_dir = Path(temp_dir)
+            page = web_dir / "index.html"
+            page.write_text("<p>old</p>", encoding="utf-8")
+            assets = server._load_static_assets(web_dir)
+
+            with patch.dict(server._static_assets, assets, clear=True):
+                connection = http.client.HTTPConnection("127.0.0.1", self.httpd.server_port, timeout=5)
+                try:
+                    connection.request("GET", "/index.html")
+                    before = connection.getresponse().read()
+                    page.write_text("<p>new page</p>", encoding="utf-8")
+                    connection.request("GET", "/index.html")
+                    after = connection.getresponse().read()
+                finally:
+                    connection.close()
+
+        self.assertEqual(before, b"<p>old</p>")
+        self.assertEqual(after, b"<p>new page</p>")
+
+
+class StatusRunningCacheTests(unittest.TestCase):
+    def test_running_probe_is_reused_within_ttl(self):
+        with patch.object(server, "_running_cache", (0.0, False)), \
+                patch("process_manager.ProcessManager") as manager_class:
+            manager_class.return_value.is_running.return_value = True
+            first = server._cached_is_running(Mock())
+            second = server._cached_is_running(Mock())
+            with patch.object(server, "STATUS_RUNNING_TTL", 0):
+                server._running_cache = (0.0, True)
+                manager_class.return_value.is_running.return_value = False
+                expired = server._cached_is_running(Mock())
+
+        self.assertEqual((first, second, expired), (True, True, False))
+        self.assertEqual(manager_class.return_value.is_running.call_count, 2)
+
+    def test_unchanged_status_revalidates_with_etag(self):
+        state = Mock()
+        state.get_comfyui_status.return_value = {"status": "stopped"}
+        state.get_installed_presets.return_value = []
+        httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.PresetHandler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+
+        def get_status(headers=None):
+            connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=5)
+            try:
+                connection.request("GET", "/api/status", headers=headers or {})
+                response = connection.getresponse()
+                return response.status, response.getheader("ETag"), response.read()
+            finally:
+                connection.close()
+
+        try:
+            with patch.object(server, "_state_manager", state), \
+                    patch.object(server, "_running_cache", (float("inf"), False)), \
+                    patch("start.get_install_status", return_value={"installing": False}):
+                status, etag, body = get_status()
+                revalidated = get_status({"If-None-Match": etag})
+                state.get_comfyui_status.return_value = {"status": "running"}
+                changed_status, changed_etag, _ = get_status({"If-None-Match": etag})
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join()
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["status"], "stopped")
+        self.assertEqual(revalidated, (304, etag, b""))
+        self.assertEqual(changed_status, 200)
+        self.assertNotEqual(changed_etag, etag)
+
+
+class ProgressSnapshotTests(unittest.TestCase):
+    def test_snapshot_is_reused_until_the_registry_changes(self):
+        import progress
+
+        progress.reset()
+        progress.set_download("model.safetensors", 10, 100)
+        first = progress.snapshot()
+        second = progress.snapshot()
+        progress.set_download("model.safetensors", 20, 100)
+        third = progress.snapshot()
+        progress.reset()
+
+        self.assertIs(first, second)
+        self.assertEqual(first["active"][0]["current"], 10)
+        self.assertEqual(third["active"][0]["current"], 20)
+
+
 class UninstallEndpointTests(unittest.TestCase):
     def setUp(self):
         self.httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.PresetHandler)
@@ -237,6 +662,15 @@ class UninstallEndpointTests(unittest.TestCase):
         finally:
             connection.close()
 
+    def post_shutdown(self):
+        connection = http.client.HTTPConnection("127.0.0.1", self.httpd.server_port)
+        try:
+            connection.request("POST", "/api/shutdown")
+            response = connection.getresponse()
+            return response.status, json.loads(response.read().decode())
+        finally:
+            connection.close()
+
     def wait_for_pending_shutdown(self):
         with start._operation_condition:
             return start._operation_condition.wait_for(
@@ -244,6 +678,21 @@ class UninstallEndpointTests(unittest.TestCase):
                 timeout=2,
             )
 
+    def test_repeated_shutdown_requests_start_a_single_shutdown(self):
+        shutdown_done = threading.Event()
+        runtime = Mock(side_effect=lambda **_kwargs: shutdown_done.set())
+
+        with patch.object(server, "_shutdown_claim", threading.Lock()), \
+                patch.object(server, "_shutdown_runtime", runtime):
+            first = self.post_shutdown()
+            second = self.post_shutdown()
+            self.assertTrue(shutdown_done.wait(timeout=2))
+
+        self.assertEqual(first, (200, {"success": True, "message": "Shutdown initiated"}))
+        self.assertEqual(second[0], 200)
+        self.assertEqual(second[1]["message"], "Shutdown already in progress")
+        runtime.assert_called_once_with(terminate_process=True)
+
     def test_active_reserved_install_blocks_uninstall_without_downloader(self):
         self.assertTrue(start.reserve_install_slot())
         try:
@@ -261,6 +710,47 @@ class UninstallEndpointTests(unittest.TestCase):
         })
         uninstall_preset.assert_not_called()
 
+    def test_uninstall_rejects_malformed_or_empty_bodies(self):
+        connection = http.client.HTTPConnection("127.0.0.1", self.httpd.server_port)
+        try:
+            connection.request("POST", "/api/uninstall", headers={"Content-Length": "abc"})
+            invalid = connection.getresponse()
+            invalid.read()
+        finally:
+            connection.close()
+        connection = http.client.HTTPConnection("127.0.0.1", self.httpd.server_port)
+        try:
+            connection.request("POST", "/api/uninstall", body=b"")
+            empty = connection.getresponse()
+            empty.read()
+        finally:
+            connection.close()
+
+        self.assertEqual(invalid.status, 400)
+        self.assertEqual(empty.status, 400)
+
+    def test_install_rejects_malformed_payloads_before_reserving(self):
+        bodies = [
+            b"",
+            b"{}",
+            b"{not json",
+            b'["Preset"]',
+            b'{"presets": "Preset"}',
+            b'{"presets": ["Preset"], "extra_flags": [1]}',
+        ]
+        with patch("start.reserve_install_slot") as reserve:
+            for body in bodies:
+                with self.subTest(body=body):
+                    connection = http.client.HTTPConnection("127.0.0.1", self.httpd.server_port)
+                    try:
+                        connection.request("POST", "/api/install", body=body)
+                        response = connection.getresponse()
+                        response.read()
+                    finally:
+                        connection.close()
+                    self.assertEqual(response.status, 400)
+        reserve.assert_not_called()
+
     def test_uninstall_without_installation_preserves_success_response(self):
         expected = {"success": True, "preset": "Pinned", "deleted": []}
         with patch("start.uninstall_preset", return_value=expected) as uninstall_preset:
@@ -279,7 +279,8 @@ function renderProgress(progress) {
 }
 
 async function pollStatus() {
-    if (statusPolling.inFlight) return;
+    // A background tab skips its polls; it catches up when shown again.
+    if (statusPolling.inFlight || document.hidden) return;
     const requestId = ++statusPolling.requestId;
     const lifecycleGeneration = statusPolling.lifecycleGeneration;
     const beganDuringLifecycleMutation = statusPolling.pendingLifecycleMutations > 0;
@@ -652,6 +653,9 @@ document.addEventListener("DOMContentLoaded", () => {
     document.getElementById("manage-close").addEventListener("click", () => {
         document.getElementById("manage-dialog").close();
     });
+    document.addEventListener("visibilitychange", () => {
+        if (!document.hidden) pollStatus();
+    });
     loadPresets();
     startStatusPolling();
 });